@@ -0,0 +1,222 @@
+"""
+Reddit Agent Benchmarks
+-----------------------
+Offline throughput and latency benchmarks against a local fake Reddit backend.
+
+Example:
+    python benchmark.py --posts 2000 --latency 0.02 --sizes 1000,100000 --output bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from event_journal import EventJournal
+from fake_reddit import FakeReddit, OfflineAgent
+from post_scheduler import PostScheduler, TokenBucket
+from retry_policy import RetryPolicy
+
+STATUSES = ("success", "success", "success", "failed")
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p90/p99/max of ``samples`` in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return round(ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] * 1000, 3)
+
+    return {"p50_ms": pick(0.5), "p90_ms": pick(0.9), "p99_ms": pick(0.99), "max_ms": pick(1.0)}
+
+
+def synthetic_events(count: int, subreddits: int = 40, seed: int = 1):
+    """Yield ``count`` events shaped like the agent's, oldest first."""
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(seconds=count)
+    for i in range(count):
+        status = rng.choice(STATUSES)
+        event = {
+            "event_id": f"{seed:08x}{i:024x}",
+            "timestamp": (start + timedelta(seconds=i)).isoformat(),
+            "action": "post_attempt",
+            "subreddit": f"subreddit{rng.randrange(subreddits)}",
+            "title": f"Benchmark post {i}",
+            "status": status,
+        }
+        if status == "success":
+            event.update(post_id=format(i, "x"), post_url=f"https://redd.it/{i:x}")
+        else:
+            event["error"] = "received 503 HTTP response"
+        yield event
+
+
+def bench_posting(workdir: str, args) -> Dict[str, Any]:
+    """Posts per second and per-post latency through batch_post with spacing disabled."""
+    # The fake's rate-limit headers feed the scheduler's budget, so they must not bind either
+    reddit = FakeReddit(latency=args.latency, jitter=args.latency / 2,
+                        error_rate=args.error_rate, seed=args.seed,
+                        requests_per_window=1 << 40)
+    agent = OfflineAgent(reddit, journal_file=os.path.join(workdir, "posting.jsonl"),
+                         log_file=None,
+                         # A console line per post would bury the results and be measured with them
+                         log_level=logging.WARNING,
+                         collect_performance=False,
+                         duplicate_index=os.path.join(workdir, "fingerprints.db"),
+                         # Failures are part of the measurement; retrying them would only add backoff sleeps
+                         retry_policy=RetryPolicy(max_attempts=1))
+    posts = [{"subreddit": f"subreddit{i % args.subreddits}",
+              "title": f"Benchmark post {i}",
+              "content": "Benchmark body"} for i in range(args.posts)]
+    # Measure the pipeline itself: no spacing and an effectively unlimited budget
+    scheduler = PostScheduler(delay_range=(0, 0),
+                              bucket=TokenBucket(rate=1e9, capacity=1e9))
+    started = {}
+    latencies = []
+
+    def on_start(post):
+        started[id(post)] = time.perf_counter()
+
+    def on_result(post, event):
+        latencies.append(time.perf_counter() - started.pop(id(post)))
+
+    begin = time.perf_counter()
+    results = agent.batch_post(posts, scheduler=scheduler, on_start=on_start, on_result=on_result)
+    elapsed = time.perf_counter() - begin
+    agent.close()
+    return {
+        "posts": len(results),
+        "seconds": round(elapsed, 4),
+        "posts_per_second": round(len(results) / elapsed, 2) if elapsed else None,
+        "failed": sum(1 for r in results if r.get("status") != "success"),
+        "api_requests": dict(reddit.request_counts),
+        "latency": percentiles(latencies),
+    }
+
+
+def bench_export(workdir: str, size: int) -> Dict[str, Any]:
+    """Cost of export_events for a journal holding ``size`` events."""
+    journal_path = os.path.join(workdir, f"export-{size}.jsonl")
+    journal = EventJournal(journal_path, fsync_every=1 << 30, fsync_interval=float("inf"),
+                           max_bytes=1 << 40)
+    begin = time.perf_counter()
+    for event in synthetic_events(size):
+        journal.append(event)
+    journal.flush()
+    append_seconds = time.perf_counter() - begin
+
+    output = os.path.join(workdir, f"export-{size}.json")
+    begin = time.perf_counter()
+    count = journal.snapshot(output)
+    export_seconds = time.perf_counter() - begin
+    journal.close()
+    result = {
+        "events": count,
+        "append_us_per_event": round(append_seconds / size * 1e6, 3),
+        "export_seconds": round(export_seconds, 4),
+        "export_bytes": os.path.getsize(output),
+    }
+    os.remove(output)
+    os.remove(journal_path)
+    return result
+
+
+def bench_dashboard(size: int, repeat: int) -> Dict[str, Any]:
+    """Response times of the dashboard API with ``size`` stored events."""
+    import reddit_dashboard
+
+    reddit_dashboard.reset_cache()
+    begin = time.perf_counter()
+    reddit_dashboard.ingest_events(list(synthetic_events(size)))
+    ingest_seconds = time.perf_counter() - begin
+
+    client = reddit_dashboard.app.test_client()
+    latest = reddit_dashboard.event_store.last_seq
+    queries = {
+        "events_first_page": "/api/events",
+        "events_since_recent": f"/api/events?since={max(latest - 10, 0)}",
+        "events_filtered": "/api/events?subreddit=subreddit7&status=failed",
+        "status": "/api/status",
+        "stats": "/api/stats",
+        "stats_subreddit": "/api/stats?subreddit=subreddit7&bucket=1d",
+    }
+    result = {"events": size, "ingest_seconds": round(ingest_seconds, 4)}
+    for name, url in queries.items():
+        samples = []
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            response = client.get(url)
+            samples.append(time.perf_counter() - begin)
+            assert response.status_code == 200, (url, response.status_code)
+        result[name] = percentiles(samples)
+
+    # Unchanged poll revalidated with the ETag
+    etag = client.get("/api/events").headers.get("ETag")
+    samples = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        response = client.get("/api/events", headers={"If-None-Match": etag})
+        samples.append(time.perf_counter() - begin)
+        assert response.status_code == 304
+    result["events_not_modified"] = percentiles(samples)
+
+    reddit_dashboard.reset_cache()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the Reddit posting agent")
+    parser.add_argument("--posts", type=int, default=1000, help="Posts to make in the posting benchmark")
+    parser.add_argument("--subreddits", type=int, default=40, help="Distinct subreddits in the posting benchmark")
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake API latency per request, in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Fraction of submissions that fail with a 5xx")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Comma-separated event counts for export and dashboard benchmarks")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests per dashboard endpoint measurement")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the fake backend")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    workdir = tempfile.mkdtemp(prefix="reddit-agent-bench-")
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "export": {},
+        "dashboard": {},
+    }
+    try:
+        print(f"Posting benchmark: {args.posts} posts...")
+        results["posting"] = bench_posting(workdir, args)
+        print(f"  {results['posting']['posts_per_second']} posts/s, latency {results['posting']['latency']}")
+
+        for size in sizes:
+            print(f"Export benchmark: {size} events...")
+            results["export"][str(size)] = bench_export(workdir, size)
+            print(f"  {results['export'][str(size)]['export_seconds']} s")
+
+            print(f"Dashboard benchmark: {size} events...")
+            results["dashboard"][str(size)] = bench_dashboard(size, args.repeat)
+            print(f"  /api/events p50 {results['dashboard'][str(size)]['events_first_page'].get('p50_ms')} ms, "
+                  f"/api/status p50 {results['dashboard'][str(size)]['status'].get('p50_ms')} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Campaign Config Loader
+----------------------
+Streaming reader and schema validation for posting configuration files.
+"""
+import json
+import os
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Reddit rejects titles longer than this
+MAX_TITLE_LENGTH = 300
+# Exactly one of these must be set on each item
+BODY_FIELDS = ("content", "url", "image_path")
+
+_decoder = json.JSONDecoder()
+# Characters a truncated JSON number can end with ("1.", "2e", "3e-")
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+class ConfigError(ValueError):
+    """Raised when a config file cannot be parsed."""
+
+
+def _iter_json_lines(f, chunk_size: int) -> Iterator[Any]:
+    for line_number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise ConfigError(f"line {line_number}: {str(e)}")
+
+
+def _iter_json_array(f, chunk_size: int) -> Iterator[Any]:
+    buffer = ""
+    while not buffer:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        buffer = chunk.lstrip()
+    if not buffer.startswith('['):
+        raise ConfigError("expected a JSON array")
+    pos = 1
+    eof = False
+    expect_item = True
+    has_items = False
+    while True:
+        # Skip whitespace and separators, reading more input when the buffer runs out
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+
+        if pos >= len(buffer):
+            raise ConfigError("unexpected end of file inside array")
+        if buffer[pos] == ']':
+            if expect_item and has_items:
+                raise ConfigError("trailing ',' before ']'")
+            # Only whitespace may follow the array
+            rest = buffer[pos + 1:]
+            while True:
+                if rest.strip():
+                    raise ConfigError(f"unexpected data after the array near {rest.strip()[:20]!r}")
+                if eof:
+                    return
+                rest = f.read(chunk_size)
+                eof = not rest
+        if not expect_item:
+            if buffer[pos] != ',':
+                raise ConfigError(f"expected ',' or ']' near {buffer[pos:pos + 20]!r}")
+            pos += 1
+            expect_item = True
+            continue
+
+        try:
+            item, end = _decoder.raw_decode(buffer, pos)
+        except ValueError as e:
+            if eof:
+                raise ConfigError(str(e))
+            # Probably an item split across chunks; read more and retry
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        # A number running to the end of the buffer may continue in the next chunk
+        if (not eof and isinstance(item, (int, float)) and not isinstance(item, bool)
+                and not buffer[end:].lstrip(_NUMBER_CHARS)):
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield item
+        buffer, pos = buffer[end:], 0
+        expect_item = False
+        has_items = True
+
+
+def iter_post_config(config_file: str, chunk_size: int = 64 * 1024) -> Iterator[Dict[str, Any]]:
+    """Yield config items one at a time from a JSONL file or a JSON array file.
+
+    ``.jsonl``/``.ndjson`` files are read line by line; other files are
+    treated as a JSON array and parsed incrementally, so memory use is
+    bounded by the largest single item rather than the file size.
+    """
+    with open(config_file, 'r', encoding='utf-8') as f:
+        if config_file.endswith(('.jsonl', '.ndjson')):
+            reader = _iter_json_lines
+        else:
+            # Sniff the first character so JSONL files with other extensions still work
+            start = f.read(1)
+            while start and start.isspace():
+                start = f.read(1)
+            f.seek(0)
+            reader = _iter_json_array if start == '[' else _iter_json_lines
+        yield from reader(f, chunk_size)
+
+
+def validate_post_item(item: Any) -> List[str]:
+    """Return the schema problems with one config item (empty if it is valid)."""
+    if not isinstance(item, dict):
+        return ["item is not an object"]
+
+    errors = []
+    subreddit = item.get("subreddit")
+    if not isinstance(subreddit, str) or not subreddit.strip():
+        errors.append("missing subreddit")
+
+    title = item.get("title")
+    if not isinstance(title, str) or not title.strip():
+        errors.append("missing title")
+    elif len(title) > MAX_TITLE_LENGTH:
+        errors.append(f"title is {len(title)} characters (max {MAX_TITLE_LENGTH})")
+
+    bodies = [field for field in BODY_FIELDS if item.get(field)]
+    if len(bodies) != 1:
+        errors.append(f"exactly one of {', '.join(BODY_FIELDS)} must be set (got {len(bodies)})")
+
+    url = item.get("url")
+    if url and not (isinstance(url, str) and url.startswith(("http://", "https://"))):
+        errors.append(f"url {url!r} is not an http(s) URL")
+
+    image_path = item.get("image_path")
+    if image_path and not os.path.isfile(image_path):
+        errors.append(f"image file {image_path} not found")
+
+    return errors
+
+
+def validate_post_config(config_file: str, max_errors: int = 50) -> Tuple[int, List[str]]:
+    """Stream through a config file and check every item before anything is posted.
+
+    Returns ``(item_count, errors)``; ``errors`` holds at most ``max_errors``
+    messages, each prefixed with the item's position.
+    """
+    count = 0
+    errors = []
+    try:
+        for count, item in enumerate(iter_post_config(config_file), start=1):
+            for problem in validate_post_item(item):
+                if len(errors) < max_errors:
+                    errors.append(f"item {count}: {problem}")
+    except ConfigError as e:
+        errors.append(f"parse error after item {count}: {str(e)}")
+    return count, errors
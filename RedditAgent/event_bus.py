@@ -0,0 +1,216 @@
+"""
+Event Bus
+---------
+Publish/subscribe delivery of agent events to the dashboard, in-process or
+over a local Unix socket.
+"""
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("RedditAgent.bus")
+
+
+class Subscription:
+    """A subscriber's bounded buffer of events."""
+
+    def __init__(self, bus: "EventBus", maxsize: int):
+        self._bus = bus
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _offer(self, event: Dict[str, Any], timeout: float) -> None:
+        try:
+            self._queue.put(event, timeout=timeout)
+        except queue.Full:
+            # The subscriber is too slow: drop the oldest event to make room
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                self.dropped += 1
+
+    def get_batch(self, max_items: int = 500, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Wait up to ``timeout`` for an event, then return it with any others already buffered."""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < max_items:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    """In-memory publish/subscribe for events.
+
+    Each subscriber has a buffer of ``maxsize`` events. When it is full,
+    ``publish`` waits up to ``block_timeout`` seconds for the subscriber to
+    catch up (backpressure on the publisher), then drops that subscriber's
+    oldest event rather than stalling posting.
+    """
+
+    def __init__(self, maxsize: int = 10000, block_timeout: float = 0.05):
+        self.maxsize = maxsize
+        self.block_timeout = block_timeout
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self.maxsize)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription._offer(event, self.block_timeout)
+
+
+def consume(subscription: Subscription, handler: Callable[[List[Dict[str, Any]]], None],
+            stop: Optional[threading.Event] = None) -> threading.Thread:
+    """Deliver batches from ``subscription`` to ``handler`` on a daemon thread."""
+    def run():
+        while stop is None or not stop.is_set():
+            batch = subscription.get_batch(timeout=0.5)
+            if batch:
+                try:
+                    handler(batch)
+                except Exception as e:
+                    logger.error("Event bus handler failed: %s", e)
+
+    thread = threading.Thread(target=run, name="event-bus-consumer", daemon=True)
+    thread.start()
+    return thread
+
+
+class UnixSocketPublisher:
+    """Publishes events as JSON lines to a ``UnixSocketBusServer`` in another process.
+
+    Publishing never blocks posting for long: events are buffered (at most
+    ``buffer_size``, oldest dropped first) while the server is unreachable,
+    reconnects are attempted at most every ``retry_interval`` seconds, and
+    sends time out after ``send_timeout``.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 10000,
+                 retry_interval: float = 2.0, send_timeout: float = 0.5):
+        self.path = path
+        self.retry_interval = retry_interval
+        self.send_timeout = send_timeout
+        self._buffer = deque(maxlen=buffer_size)
+        self._socket = None
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> bool:
+        if self._socket is not None:
+            return True
+        now = time.monotonic()
+        if now < self._next_attempt:
+            return False
+        self._next_attempt = now + self.retry_interval
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.send_timeout)
+            sock.connect(self.path)
+        except OSError:
+            return False
+        self._socket = sock
+        return True
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        line = (json.dumps(event, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+        with self._lock:
+            self._buffer.append(line)
+            if not self._connect():
+                return
+            try:
+                while self._buffer:
+                    self._socket.sendall(self._buffer[0])
+                    self._buffer.popleft()
+            except OSError:
+                # Server gone or too slow; keep the buffer and reconnect later
+                self._socket.close()
+                self._socket = None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+
+class UnixSocketBusServer:
+    """Accepts ``UnixSocketPublisher`` connections and republishes their events on a local bus."""
+
+    def __init__(self, path: str, bus: EventBus):
+        self.path = path
+        self.bus = bus
+        if os.path.exists(path):
+            os.remove(path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen()
+        self._closed = False
+
+    def start(self) -> "UnixSocketBusServer":
+        threading.Thread(target=self._accept_loop, name="event-bus-server", daemon=True).start()
+        return self
+
+    def _accept_loop(self) -> None:
+        while not self._closed:
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._read_loop, args=(connection,), daemon=True).start()
+
+    def _read_loop(self, connection: socket.socket) -> None:
+        partial = b''
+        with connection:
+            while True:
+                try:
+                    data = connection.recv(65536)
+                except OSError:
+                    return
+                if not data:
+                    return
+                lines = (partial + data).split(b'\n')
+                partial = lines.pop()
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    try:
+                        self.bus.publish(json.loads(line))
+                    except ValueError as e:
+                        logger.warning("Skipping malformed bus message: %s", e)
+
+    def close(self) -> None:
+        self._closed = True
+        self._server.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,342 @@
+"""
+Event Journal
+-------------
+Append-only, line-delimited JSON journal for Reddit posting agent events.
+"""
+import glob
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("RedditAgent.journal")
+
+# Events per batch when replaying rotated segments
+HISTORY_BATCH = 2000
+# Bytes per read when tailing the active file
+TAIL_READ_BYTES = 1024 * 1024
+
+
+def _segment_number(path: str, segment: str) -> int:
+    suffix = segment[len(path) + 1:]
+    if suffix.endswith('.gz'):
+        suffix = suffix[:-3]
+    return int(suffix) if suffix.isdigit() else -1
+
+
+def rotated_segments(path: str) -> List[str]:
+    """Return the rotated segment paths of the journal at ``path``, oldest first."""
+    candidates = glob.glob(glob.escape(path) + '.*')
+    numbered = {}
+    for candidate in sorted(candidates):
+        number = _segment_number(path, candidate)
+        if number >= 0 and not candidate.endswith('.tmp'):
+            # While a segment is being compressed both forms may exist; the .gz sorts last and wins
+            numbered[number] = candidate
+    return [numbered[number] for number in sorted(numbered)]
+
+
+def _open_segment(segment: str):
+    return gzip.open(segment, 'rb') if segment.endswith('.gz') else open(segment, 'rb')
+
+
+class EventJournal:
+    """Crash-safe append-only journal of events, one JSON object per line.
+
+    Every append is written and flushed to the OS immediately so readers can
+    tail the file; ``fsync`` is batched every ``fsync_every`` events or
+    ``fsync_interval`` seconds, whichever comes first. When the active file
+    grows past ``max_bytes`` it is rotated to ``<path>.<n>`` and a fresh
+    file is started; with ``compress`` the rotated segment is gzipped on a
+    background thread so appends never wait for it.
+    """
+
+    def __init__(self,
+                 path: str = "events.jsonl",
+                 fsync_every: int = 16,
+                 fsync_interval: float = 1.0,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 backup_count: int = 20,
+                 compress: bool = True):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._file = None
+        self._compressor = None
+        self._pending_sync = 0
+        self._last_sync = time.monotonic()
+        self._open()
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        self._size = self._file.tell()
+
+    def append(self, event: Dict[str, Any]) -> None:
+        """Append one event to the journal."""
+        line = (json.dumps(event, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+        with self._lock:
+            if self._size and self._size + len(line) > self.max_bytes:
+                self._rotate()
+            self._file.write(line)
+            self._file.flush()
+            self._size += len(line)
+            self._pending_sync += 1
+            if (self._pending_sync >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._pending_sync = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self) -> None:
+        """Flush and fsync any buffered events."""
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._file.flush()
+                self._sync()
+
+    def rotated_segments(self) -> List[str]:
+        """Return rotated segment paths, oldest first."""
+        return rotated_segments(self.path)
+
+    def segments(self) -> List[str]:
+        """Return all segment paths, oldest first, ending with the active file."""
+        return self.rotated_segments() + [self.path]
+
+    def _rotate(self) -> None:
+        self._file.flush()
+        self._sync()
+        self._file.close()
+
+        rotated = self.rotated_segments()
+        number = _segment_number(self.path, rotated[-1]) + 1 if rotated else 1
+        target = f"{self.path}.{number}"
+        os.replace(self.path, target)
+
+        rotated = self.rotated_segments()
+        if self.backup_count and len(rotated) > self.backup_count:
+            for old in rotated[:len(rotated) - self.backup_count]:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    # Already replaced by its compressed form
+                    pass
+
+        self._open()
+        if self.compress:
+            # Chained so segments are compressed one at a time, in order
+            self._compressor = threading.Thread(target=self._compress, args=(target, self._compressor),
+                                                name="journal-compress", daemon=True)
+            self._compressor.start()
+        logger.info("Rotated event journal to %s", target)
+
+    @staticmethod
+    def _compress(segment: str, previous: Optional[threading.Thread] = None) -> None:
+        if previous is not None:
+            previous.join()
+        tmp = segment + '.gz.tmp'
+        try:
+            with open(segment, 'rb') as src, gzip.open(tmp, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp, segment + '.gz')
+            os.remove(segment)
+        except OSError as e:
+            # The uncompressed segment stays readable; only disk space is lost
+            logger.warning("Could not compress journal segment %s: %s", segment, e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def wait_for_compression(self) -> None:
+        """Block until rotated segments queued for compression are done."""
+        compressor = self._compressor
+        if compressor is not None:
+            compressor.join()
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """Yield the raw JSON line of every journaled event, oldest first."""
+        self.flush()
+        self.wait_for_compression()
+        for segment in self.segments():
+            if not os.path.exists(segment):
+                continue
+            with _open_segment(segment) as f:
+                for line in f:
+                    # A crash can leave a truncated final line; skip it
+                    if line.endswith(b'\n') and line.strip():
+                        yield line.rstrip(b'\n')
+
+    def iter_events(self) -> Iterator[Dict[str, Any]]:
+        """Yield every journaled event, oldest first."""
+        for line in self.iter_lines():
+            yield json.loads(line)
+
+    def snapshot(self, output_file: str) -> int:
+        """Write the journal to ``output_file`` and return the number of events.
+
+        ``.jsonl`` targets get the line-delimited form; anything else gets a
+        JSON array. Records are copied as raw lines without being re-parsed,
+        and the target is replaced atomically.
+        """
+        tmp = output_file + '.tmp'
+        count = 0
+        line_delimited = output_file.endswith('.jsonl')
+        with open(tmp, 'wb') as out:
+            if not line_delimited:
+                out.write(b'[')
+            for line in self.iter_lines():
+                if line_delimited:
+                    out.write(line + b'\n')
+                else:
+                    out.write((b',\n' if count else b'\n') + line)
+                count += 1
+            if not line_delimited:
+                out.write(b'\n]\n' if count else b']\n')
+        os.replace(tmp, output_file)
+        return count
+
+    def close(self) -> None:
+        """Flush, fsync and close the active file, and finish compressing rotated ones."""
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._file.flush()
+                self._sync()
+                self._file.close()
+        self.wait_for_compression()
+
+
+class JournalTailer:
+    """Incremental reader for an ``EventJournal`` file.
+
+    Remembers its byte offset and only parses records appended since the
+    last read, at most about ``read_bytes`` at a time. A trailing partial
+    line is held back until it is completed. Rotation (the path now refers
+    to a different file) is handled by draining the old file before
+    switching; truncation restarts from the beginning. Reads must happen at
+    least once per rotation, which at the journal's segment sizes is never
+    a constraint in practice.
+    """
+
+    def __init__(self, path: str = "events.jsonl", read_bytes: int = TAIL_READ_BYTES):
+        self.path = path
+        self.read_bytes = read_bytes
+        self._file = None
+        self._inode = None
+        self._partial = b''
+
+    def _open(self) -> bool:
+        try:
+            self._file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return False
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._partial = b''
+        return True
+
+    def open(self) -> bool:
+        """Start following the active file now, before the first read.
+
+        Call it before ``read_rotated`` so a rotation in between is still
+        drained by this tailer. Returns whether the file exists.
+        """
+        return self._file is not None or self._open()
+
+    def _close(self) -> None:
+        if self._file:
+            self._file.close()
+        self._file = None
+        self._inode = None
+        self._partial = b''
+
+    @staticmethod
+    def _parse(lines: List[bytes]) -> List[Dict[str, Any]]:
+        events = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError as e:
+                logger.warning("Skipping malformed journal line: %s", e)
+        return events
+
+    def _drain(self) -> Optional[List[Dict[str, Any]]]:
+        """Parse the next chunk of the open file; ``None`` once it is at end of file."""
+        while True:
+            data = self._file.read(self.read_bytes)
+            if not data:
+                return None
+            lines = (self._partial + data).split(b'\n')
+            self._partial = lines.pop()
+            events = self._parse(lines)
+            # Keep reading through blank, malformed or very long lines
+            if events or len(data) < self.read_bytes:
+                return events
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        """Return the next events appended since the previous call.
+
+        At most about ``read_bytes`` of the journal are read per call, so
+        callers should repeat it until it returns an empty list.
+        """
+        if self._file is None and not self._open():
+            return []
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+
+        if stat is not None and stat.st_ino == self._inode and stat.st_size < self._file.tell():
+            # Truncated in place
+            self._file.seek(0)
+            self._partial = b''
+
+        events = self._drain()
+        if events is not None:
+            return events
+        if stat is None or stat.st_ino == self._inode:
+            return []
+        # Rotated: the old file is drained, so move to the new one
+        self._close()
+        if not self._open():
+            return []
+        return self._drain() or []
+
+    def read_rotated(self, batch_size: int = HISTORY_BATCH) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the events of every rotated segment, oldest first, ``batch_size`` at a time."""
+        batch = []
+        for segment in rotated_segments(self.path):
+            try:
+                f = _open_segment(segment)
+            except FileNotFoundError:
+                # Compressed (or expired) since it was listed
+                if segment.endswith('.gz') or not os.path.exists(segment + '.gz'):
+                    continue
+                f = _open_segment(segment + '.gz')
+            with f:
+                for line in f:
+                    # A crash can leave a truncated final line; skip it
+                    if not line.endswith(b'\n'):
+                        continue
+                    batch.append(line)
+                    if len(batch) >= batch_size:
+                        yield self._parse(batch)
+                        batch = []
+        if batch:
+            yield self._parse(batch)
+
+    def close(self) -> None:
+        self._close()
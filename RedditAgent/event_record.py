@@ -0,0 +1,108 @@
+"""
+Event Records
+-------------
+Compact in-memory form of agent events.
+"""
+import sys
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Low-cardinality values shared between records instead of copied into each
+_INTERNED = ("action", "subreddit", "title", "tenant", "status", "error")
+_TIMESTAMPS = ("timestamp", "timestamp_complete")
+_PLAIN = ("event_id", "post_id", "post_url")
+_KNOWN = frozenset(_INTERNED + _TIMESTAMPS + _PLAIN + ("seq", "timings"))
+
+# Shared tuples of timing phase names, e.g. ('wait', 'validate', 'submit')
+_phase_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_iso(epoch: Optional[float]) -> Optional[str]:
+    return None if epoch is None else datetime.fromtimestamp(epoch).isoformat()
+
+
+class EventRecord:
+    """One event in about a third of the memory of its dict form.
+
+    Timestamps are epoch seconds, repeated strings are interned, timing
+    phase names are shared tuples, and fields nobody set take no space
+    beyond their slot. ``to_dict`` rebuilds the JSON shape the agent writes.
+    """
+
+    __slots__ = ("seq", "event_id", "timestamp", "action", "subreddit", "title", "tenant",
+                 "status", "post_id", "post_url", "error", "timestamp_complete",
+                 "_phases", "_seconds", "extra")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+
+    @classmethod
+    def from_dict(cls, event: Dict[str, Any], seq: Optional[int] = None) -> "EventRecord":
+        record = cls.__new__(cls)
+        get = event.get
+        intern = sys.intern
+        record.seq = seq if seq is not None else get("seq")
+        record.event_id = get("event_id")
+        record.timestamp = _to_epoch(get("timestamp"))
+        record.timestamp_complete = _to_epoch(get("timestamp_complete"))
+        for name in _INTERNED:
+            value = get(name)
+            setattr(record, name, intern(value) if value.__class__ is str else value)
+        record.post_id = get("post_id")
+        record.post_url = get("post_url")
+        timings = get("timings")
+        if timings:
+            phases = tuple(timings)
+            record._phases = _phase_tuples.setdefault(phases, phases)
+            record._seconds = tuple(timings.values())
+        else:
+            record._phases = record._seconds = None
+        record.extra = None
+        if not _KNOWN.issuperset(event):
+            record.extra = {key: value for key, value in event.items() if key not in _KNOWN}
+        return record
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        return dict(zip(self._phases, self._seconds)) if self._phases else {}
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Dict-style read of a field, in its JSON form."""
+        if name in _TIMESTAMPS:
+            value = _to_iso(getattr(self, name))
+        elif name == "timings":
+            value = self.timings if self._phases else None
+        elif name in _KNOWN:
+            value = getattr(self, name)
+        else:
+            value = self.extra.get(name) if self.extra else None
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The event as the agent journals it (plus ``seq`` if assigned)."""
+        event = {}
+        for name in ("event_id", "timestamp", "action", "subreddit", "title", "tenant"):
+            value = self.get(name)
+            if value is not None:
+                event[name] = value
+        if self._phases:
+            event["timings"] = self.timings
+        for name in ("status", "post_id", "post_url", "error", "timestamp_complete"):
+            value = self.get(name)
+            if value is not None:
+                event[name] = value
+        if self.extra:
+            event.update(self.extra)
+        if self.seq is not None:
+            event["seq"] = self.seq
+        return event
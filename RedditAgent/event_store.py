@@ -0,0 +1,436 @@
+"""
+Event Store
+-----------
+SQLite store of ingested events for the dashboard, with indexed lookups
+and rollup tables for analytics.
+"""
+import hashlib
+import itertools
+import json
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from event_record import EventRecord
+
+# Widths of the time rollups, in seconds; /api/stats buckets are multiples of the finest
+ROLLUP_WIDTHS = (60, 3600, 86400)
+# Rollup bucket of events without a timestamp; only whole-history breakdowns count them
+UNTIMED = -1
+# Statuses counted separately in stats, and the key each is reported under
+STATUS_KEYS = {"success": "success", "failed": "failed",
+               "skipped_duplicate": "skipped", "retry_scheduled": "retrying"}
+# Duplicates were never attempted and retried posts end in a later event
+NOT_ATTEMPTED = ("skipped_duplicate", "retry_scheduled")
+
+_HTTP_STATUS = re.compile(r"received (\d{3}) HTTP response")
+
+
+def error_type(event: Dict[str, Any]) -> Optional[str]:
+    """Coarse category of a failed event's error, for breakdowns."""
+    if event.get("error_type"):
+        return event["error_type"]
+    error = event.get("error")
+    if not error:
+        return None
+    if "RATELIMIT" in error or "doing that a lot" in error:
+        return "ratelimit"
+    match = _HTTP_STATUS.search(error)
+    if match:
+        return f"http_{match.group(1)}"
+    if "could not be validated" in error:
+        return "subreddit_unavailable"
+    if error.startswith("Could not prepare post"):
+        return "prepare"
+    return "other"
+
+
+def success_rate(counts: Dict[str, int]) -> Optional[float]:
+    """Share of attempted posts that succeeded, from counts by status.
+
+    Statuses in ``NOT_ATTEMPTED`` are left out of the denominator.
+    """
+    attempted = sum(counts.values()) - sum(counts.get(status, 0) for status in NOT_ATTEMPTED)
+    return round(counts.get("success", 0) / attempted, 4) if attempted else None
+
+
+def event_key(event: Dict[str, Any]) -> str:
+    """Identity used to drop duplicates; events from older agents have no ``event_id``."""
+    if event.get("event_id"):
+        return event["event_id"]
+    canonical = json.dumps(event, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class EventStore:
+    """Events in SQLite, numbered by ``seq`` in ingestion order.
+
+    Rows are indexed on subreddit, status, tenant and timestamp for the
+    event API. Counts by status, by subreddit and by error type are kept in
+    rollup tables per minute, hour and day as events arrive, so statistics
+    over any time range read rollup rows, and raw events only for the
+    partial minutes at its edges. ``path=None`` uses a temporary file that
+    is removed on ``close``.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="reddit-dashboard-", suffix=".db")
+            os.close(fd)
+            self._temporary = True
+        else:
+            self._temporary = False
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._create_schema()
+        self.last_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+        self.count = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        # Bumped on every change, including metrics merged into existing rows
+        self.version = 0
+
+    def _create_schema(self) -> None:
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                seq INTEGER PRIMARY KEY,
+                event_key TEXT NOT NULL UNIQUE,
+                ts REAL,
+                subreddit TEXT COLLATE NOCASE,
+                status TEXT,
+                tenant TEXT,
+                error_type TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS events_subreddit ON events (subreddit, seq);
+            CREATE INDEX IF NOT EXISTS events_subreddit_ts ON events (subreddit, ts, status, error_type);
+            CREATE INDEX IF NOT EXISTS events_status ON events (status, seq);
+            CREATE INDEX IF NOT EXISTS events_tenant ON events (tenant, seq);
+            CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+            CREATE TABLE IF NOT EXISTS rollup_time (
+                width INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                tenant TEXT NOT NULL,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (width, bucket, tenant, status)
+            );
+            CREATE TABLE IF NOT EXISTS rollup_subreddit (
+                width INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                subreddit TEXT NOT NULL,
+                tenant TEXT NOT NULL,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (width, bucket, subreddit, tenant, status)
+            );
+            CREATE TABLE IF NOT EXISTS rollup_error (
+                width INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                error_type TEXT NOT NULL,
+                subreddit TEXT NOT NULL,
+                tenant TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (width, bucket, error_type, subreddit, tenant)
+            );
+        """)
+
+    def add(self, events: List[Dict[str, Any]]) -> List[Tuple[int, EventRecord]]:
+        """Store events not seen before; returns ``(seq, record)`` for each one added."""
+        with self._lock:
+            keys = [event_key(event) for event in events]
+            existing = set()
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                existing.update(row[0] for row in self._conn.execute(
+                    f"SELECT event_key FROM events WHERE event_key IN ({','.join('?' * len(chunk))})", chunk))
+
+            added = []
+            rows = []
+            times, subreddits, errors = {}, {}, {}
+            for key, event in zip(keys, events):
+                if key in existing:
+                    continue
+                existing.add(key)
+                seq = self.last_seq + len(added) + 1
+                record = EventRecord.from_dict(event, seq=seq)
+                kind = error_type(event)
+                subreddit = (record.subreddit or "").lower()
+                tenant = record.tenant or ""
+                status = record.status or "unknown"
+                data = {name: value for name, value in event.items() if name != "seq"}
+                rows.append((seq, key, record.timestamp, record.subreddit, record.status,
+                             record.tenant, kind, json.dumps(data, separators=(",", ":"), default=str)))
+                added.append((seq, record))
+
+                for width in ROLLUP_WIDTHS:
+                    if record.timestamp is None:
+                        bucket = UNTIMED
+                    else:
+                        bucket = int(record.timestamp // width) * width
+                        slot = (width, bucket, tenant, status)
+                        times[slot] = times.get(slot, 0) + 1
+                    slot = (width, bucket, subreddit, tenant, status)
+                    subreddits[slot] = subreddits.get(slot, 0) + 1
+                    if kind:
+                        slot = (width, bucket, kind, subreddit, tenant)
+                        errors[slot] = errors.get(slot, 0) + 1
+
+            if not rows:
+                return added
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.executemany(
+                "INSERT INTO rollup_time VALUES (?, ?, ?, ?, ?) ON CONFLICT (width, bucket, tenant, status) "
+                "DO UPDATE SET count = count + excluded.count",
+                [key + (count,) for key, count in times.items()])
+            self._conn.executemany(
+                "INSERT INTO rollup_subreddit VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (width, bucket, subreddit, tenant, status) "
+                "DO UPDATE SET count = count + excluded.count",
+                [key + (count,) for key, count in subreddits.items()])
+            self._conn.executemany(
+                "INSERT INTO rollup_error VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (width, bucket, error_type, subreddit, tenant) "
+                "DO UPDATE SET count = count + excluded.count",
+                [key + (count,) for key, count in errors.items()])
+            self._conn.execute("COMMIT")
+            self.last_seq += len(added)
+            self.count += len(added)
+            self.version += 1
+            return added
+
+    def merge_metrics(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach ``post_metrics`` readings to the events they refer to.
+
+        Each reading replaces the ``metrics`` of the event whose ``event_id``
+        is its ``ref_event_id``, unless that event already has a newer one.
+        Returns ``{"seq", "metrics"}`` for each event updated.
+        """
+        updated = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            for event in events:
+                metrics = event.get("metrics")
+                row = self._conn.execute("SELECT seq, data FROM events WHERE event_key = ?",
+                                         (event.get("ref_event_id"),)).fetchone()
+                if row is None or not metrics:
+                    continue
+                seq, data = row
+                data = json.loads(data)
+                current = data.get("metrics") or {}
+                if (current.get("checked_at") or "") > (metrics.get("checked_at") or ""):
+                    continue
+                data["metrics"] = metrics
+                self._conn.execute("UPDATE events SET data = ? WHERE seq = ?",
+                                   (json.dumps(data, separators=(",", ":"), default=str), seq))
+                updated.append({"seq": seq, "metrics": metrics})
+            self._conn.execute("COMMIT")
+            if updated:
+                self.version += 1
+        return updated
+
+    @staticmethod
+    def _decode(seq: int, data: str) -> Dict[str, Any]:
+        event = json.loads(data)
+        event["seq"] = seq
+        return event
+
+    def query(self, since: int = 0, before: Optional[int] = None, limit: int = 100,
+              subreddit: Optional[str] = None, status: Optional[str] = None,
+              tenant: Optional[str] = None, start: Optional[float] = None,
+              end: Optional[float] = None, oldest_first: bool = False) -> List[Dict[str, Any]]:
+        """Matching events as dicts with their ``seq``, newest first by default."""
+        clauses, params = ["seq > ?"], [since]
+        if before is not None:
+            clauses.append("seq < ?")
+            params.append(before)
+        for column, value in (("subreddit", subreddit), ("status", status), ("tenant", tenant)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(end)
+        order = "ASC" if oldest_first else "DESC"
+        sql = f"SELECT seq, data FROM events WHERE {' AND '.join(clauses)} ORDER BY seq {order} LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [self._decode(seq, data) for seq, data in rows]
+
+    def stats(self, bucket_seconds: int = 3600, start: Optional[float] = None,
+              end: Optional[float] = None, subreddit: Optional[str] = None,
+              tenant: Optional[str] = None) -> Dict[str, Any]:
+        """Time-bucketed post/failure counts, per-subreddit success rates and error types.
+
+        The range from ``start`` to ``end`` (inclusive, either may be open)
+        is split into whole days, hours and minutes answered from the
+        rollups, plus the partial minutes at its edges, which are counted
+        from the indexed event rows. Histogram buckets are rounded to whole
+        minutes.
+        """
+        finest = ROLLUP_WIDTHS[0]
+        bucket_seconds = max(finest, bucket_seconds // finest * finest)
+        subreddit = subreddit.lower() if subreddit else None
+        timed_only = start is not None or end is not None
+        with self._lock:
+            histogram = self._buckets(itertools.chain.from_iterable(
+                self._histogram_rows(bucket_seconds, piece, subreddit, tenant)
+                for piece in self._split_range(start, end, [width for width in ROLLUP_WIDTHS
+                                                            if bucket_seconds % width == 0])))
+            by_subreddit, by_error = {}, {}
+            for piece in self._split_range(start, end, ROLLUP_WIDTHS):
+                self._add_breakdowns(by_subreddit, by_error, piece, subreddit, tenant, timed_only)
+
+        subreddits = []
+        for name, counts in by_subreddit.items():
+            total = sum(counts.values())
+            row = {"subreddit": name, "total": total}
+            row.update((key, counts.get(status, 0)) for status, key in STATUS_KEYS.items())
+            row["success_rate"] = success_rate(counts)
+            subreddits.append(row)
+        subreddits.sort(key=lambda row: (-row["total"], row["subreddit"]))
+        return {
+            "bucket_seconds": bucket_seconds,
+            "buckets": histogram,
+            "subreddits": subreddits,
+            "error_types": dict(sorted(by_error.items(), key=lambda item: -item[1])),
+        }
+
+    @staticmethod
+    def _split_range(start: Optional[float], end: Optional[float],
+                     widths: Iterable[int]) -> List[Tuple[Optional[int], Any, Any, bool]]:
+        """Cover ``start <= ts <= end`` with rollup buckets of the coarsest widths that fit.
+
+        Returns pieces ``(width, low, high, inclusive)``: with a width, the
+        buckets from ``low`` up to (not including) ``high``; with ``None``,
+        raw events from ``low`` up to ``high`` (inclusive or not). Open
+        bounds are ``None``.
+        """
+        def split(low, high, inclusive, widths):
+            if not widths:
+                return [(None, low, high, inclusive)]
+            width = widths[0]
+            first = None if low is None else math.ceil(low / width) * width
+            last = None if high is None else math.floor(high / width) * width
+            if first is not None and last is not None and first >= last:
+                return split(low, high, inclusive, widths[1:])
+            pieces = [(width, first, last, False)]
+            if low is not None and low < first:
+                pieces += split(low, first, False, widths[1:])
+            if high is not None and (high > last or inclusive):
+                pieces += split(last, high, inclusive, widths[1:])
+            return pieces
+
+        return split(start, end, True, sorted(widths, reverse=True))
+
+    @staticmethod
+    def _rollup_filters(width, low, high, subreddit, tenant, timed_only):
+        clauses, params = ["width = ?"], [width]
+        if low is not None:
+            clauses.append("bucket >= ?")
+            params.append(low)
+        if high is not None:
+            clauses.append("bucket < ?")
+            params.append(high)
+        if timed_only:
+            clauses.append("bucket != ?")
+            params.append(UNTIMED)
+        if subreddit:
+            clauses.append("subreddit = ?")
+            params.append(subreddit)
+        if tenant:
+            clauses.append("tenant = ?")
+            params.append(tenant)
+        return " WHERE " + " AND ".join(clauses), params
+
+    @staticmethod
+    def _event_filters(low, high, inclusive, subreddit, tenant):
+        clauses, params = [], []
+        if low is not None:
+            clauses.append("ts >= ?")
+            params.append(low)
+        if high is not None:
+            clauses.append("ts <= ?" if inclusive else "ts < ?")
+            params.append(high)
+        if subreddit:
+            clauses.append("subreddit = ?")
+            params.append(subreddit)
+        if tenant:
+            clauses.append("tenant = ?")
+            params.append(tenant)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _buckets(rows: Iterable[Tuple[int, str, int]]) -> List[Dict[str, Any]]:
+        buckets = {}
+        for bucket, status, count in rows:
+            entry = buckets.get(bucket)
+            if entry is None:
+                entry = buckets[bucket] = {"start": datetime.fromtimestamp(bucket).isoformat(),
+                                           "epoch": bucket, "total": 0}
+                entry.update((key, 0) for key in STATUS_KEYS.values())
+            entry["total"] += count
+            if status in STATUS_KEYS:
+                entry[STATUS_KEYS[status]] += count
+        return [buckets[bucket] for bucket in sorted(buckets)]
+
+    def _histogram_rows(self, bucket_seconds, piece, subreddit, tenant):
+        width, low, high, inclusive = piece
+        if width is None:
+            where, params = self._event_filters(low, high, inclusive, subreddit, tenant)
+            return self._conn.execute(
+                f"SELECT CAST(ts / ? AS INTEGER) * ? AS slot, status, COUNT(*) FROM events{where} "
+                "GROUP BY slot, status", [bucket_seconds, bucket_seconds] + params).fetchall()
+        # Only the subreddit rollup can be narrowed to one subreddit
+        table = "rollup_subreddit" if subreddit else "rollup_time"
+        where, params = self._rollup_filters(width, low, high, subreddit, tenant, True)
+        return self._conn.execute(
+            f"SELECT bucket / ? * ? AS slot, status, SUM(count) FROM {table}{where} "
+            "GROUP BY slot, status", [bucket_seconds, bucket_seconds] + params).fetchall()
+
+    def _add_breakdowns(self, by_subreddit, by_error, piece, subreddit, tenant, timed_only):
+        width, low, high, inclusive = piece
+        if width is None:
+            where, params = self._event_filters(low, high, inclusive, subreddit, tenant)
+            subreddit_sql = f"SELECT LOWER(subreddit), status, COUNT(*) FROM events{where} GROUP BY 1, 2"
+            error_where = where + (" AND " if where else " WHERE ") + "error_type IS NOT NULL"
+            error_sql = f"SELECT error_type, COUNT(*) FROM events{error_where} GROUP BY error_type"
+        else:
+            where, params = self._rollup_filters(width, low, high, subreddit, tenant, timed_only)
+            subreddit_sql = f"SELECT subreddit, status, SUM(count) FROM rollup_subreddit{where} GROUP BY 1, 2"
+            error_sql = f"SELECT error_type, SUM(count) FROM rollup_error{where} GROUP BY error_type"
+        for name, status, count in self._conn.execute(subreddit_sql, params):
+            counts = by_subreddit.setdefault(name or "", {})
+            counts[status or "unknown"] = counts.get(status or "unknown", 0) + count
+        for kind, count in self._conn.execute(error_sql, params):
+            by_error[kind] = by_error.get(kind, 0) + count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.executescript("""
+                DELETE FROM events;
+                DELETE FROM rollup_time;
+                DELETE FROM rollup_subreddit;
+                DELETE FROM rollup_error;
+            """)
+            self.last_seq = 0
+            self.count = 0
+            self.version += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        if self._temporary:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
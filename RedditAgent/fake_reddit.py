@@ -0,0 +1,194 @@
+"""
+Fake Reddit
+-----------
+Local stand-in for the PRAW client, for offline benchmarks and simulations.
+"""
+import itertools
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from reddit_agent import RedditPostingAgent
+
+
+class FakeResponse:
+    """Just enough of ``requests.Response`` for prawcore's exceptions."""
+
+    def __init__(self, status_code: int, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = ""
+
+
+class FakeSubmission:
+    def __init__(self, submission_id: str, subreddit_name: str):
+        self.id = submission_id
+        self.fullname = f"t3_{submission_id}"
+        self.url = f"https://www.reddit.com/r/{subreddit_name}/comments/{submission_id}/"
+        self.score = 1
+        self.upvote_ratio = 1.0
+        self.num_comments = 0
+        self.removed_by_category = None
+
+
+class FakeAuth:
+    def __init__(self, reddit: "FakeReddit"):
+        self._reddit = reddit
+
+    @property
+    def limits(self) -> Dict[str, Any]:
+        return self._reddit.limits()
+
+
+class FakeSubreddit:
+    """Lazy subreddit object; reading ``subreddit_type`` costs a request, like PRAW."""
+
+    def __init__(self, reddit: "FakeReddit", display_name: str):
+        self._reddit = reddit
+        self.display_name = display_name
+        self.user_is_banned = display_name.lower() in reddit.banned
+
+    @property
+    def subreddit_type(self) -> str:
+        # Imported on use, like the agent does, so this module loads without praw
+        from prawcore.exceptions import Forbidden, NotFound
+        
+        self._reddit.request("about")
+        if self.display_name.lower() in self._reddit.missing:
+            raise NotFound(FakeResponse(404))
+        if self.display_name.lower() in self._reddit.private:
+            raise Forbidden(FakeResponse(403))
+        return "public"
+
+    def submit(self, title: str, selftext: Optional[str] = None, url: Optional[str] = None, **kwargs) -> FakeSubmission:
+        self._reddit.request("submit", can_fail=True)
+        return self._reddit.new_submission(self.display_name)
+
+    def submit_image(self, title: str, image_path: str, **kwargs) -> FakeSubmission:
+        # Upload lease, S3 upload and submit
+        self._reddit.request("media_asset")
+        self._reddit.request("upload", latency_factor=4)
+        self._reddit.request("submit", can_fail=True)
+        return self._reddit.new_submission(self.display_name)
+
+
+class FakeReddit:
+    """Scriptable replacement for ``praw.Reddit``.
+
+    Every request waits ``latency`` seconds (plus up to ``jitter``) via the
+    injected ``sleep``. Submissions fail with a 5xx at ``error_rate`` and with
+    a RATELIMIT API error at ``ratelimit_rate``. Rate-limit state mimics
+    Reddit's headers: ``requests_per_window`` requests per ``window`` seconds.
+    """
+
+    def __init__(self,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 ratelimit_rate: float = 0.0,
+                 ratelimit_minutes: int = 7,
+                 requests_per_window: int = 1000,
+                 window: float = 600,
+                 missing: Iterable[str] = (),
+                 private: Iterable[str] = (),
+                 banned: Iterable[str] = (),
+                 seed: Optional[int] = None,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.ratelimit_rate = ratelimit_rate
+        self.ratelimit_minutes = ratelimit_minutes
+        self.requests_per_window = requests_per_window
+        self.window = window
+        self.missing = {name.lower() for name in missing}
+        self.private = {name.lower() for name in private}
+        self.banned = {name.lower() for name in banned}
+        self._random = random.Random(seed)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._window_start = clock()
+        self._used = 0
+        self.request_counts: Dict[str, int] = {}
+        self.submissions: Dict[str, FakeSubmission] = {}
+        self.auth = FakeAuth(self)
+
+    def request(self, kind: str, can_fail: bool = False, latency_factor: float = 1) -> None:
+        """Account for one API request, sleeping for its latency and maybe failing."""
+        with self._lock:
+            now = self._clock()
+            if now - self._window_start >= self.window:
+                self._window_start = now
+                self._used = 0
+            self._used += 1
+            self.request_counts[kind] = self.request_counts.get(kind, 0) + 1
+            delay = (self.latency + self._random.uniform(0, self.jitter)) * latency_factor
+            roll = self._random.random()
+        if delay:
+            self._sleep(delay)
+        if not can_fail:
+            return
+        from praw.exceptions import RedditAPIException
+        from prawcore.exceptions import ServerError
+        
+        if roll < self.error_rate:
+            raise ServerError(FakeResponse(503))
+        if roll < self.error_rate + self.ratelimit_rate:
+            raise RedditAPIException([[
+                "RATELIMIT",
+                f"Looks like you've been doing that a lot. Take a break for {self.ratelimit_minutes} minutes before trying again.",
+                "ratelimit"
+            ]])
+
+    def limits(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "remaining": max(self.requests_per_window - self._used, 0),
+                "used": self._used,
+                "reset_timestamp": self._window_start + self.window
+            }
+
+    def new_submission(self, subreddit_name: str) -> FakeSubmission:
+        submission = FakeSubmission(format(next(self._ids), "x"), subreddit_name)
+        self.submissions[submission.fullname] = submission
+        return submission
+
+    def subreddit(self, display_name: str) -> FakeSubreddit:
+        return FakeSubreddit(self, display_name)
+
+    def info(self, fullnames: Iterable[str]) -> Iterator[FakeSubmission]:
+        """One request for up to 100 submissions; each lookup shows a little more activity."""
+        fullnames = list(fullnames)
+        if len(fullnames) > 100:
+            raise ValueError("at most 100 fullnames per request")
+        self.request("info")
+        for fullname in fullnames:
+            submission = self.submissions.get(fullname)
+            if submission is None:
+                continue
+            with self._lock:
+                submission.score += self._random.randint(0, 5)
+                submission.num_comments += self._random.randint(0, 2)
+            yield submission
+
+
+class OfflineAgent(RedditPostingAgent):
+    """``RedditPostingAgent`` wired to a ``FakeReddit`` instead of praw.Reddit."""
+
+    def __init__(self, reddit: Optional[FakeReddit] = None, **kwargs):
+        self._fake_reddit = reddit or FakeReddit()
+        super().__init__(credentials_file=None, **kwargs)
+
+    def _load_credentials(self, credentials_file: Optional[str]) -> Dict[str, str]:
+        return {}
+
+    def _initialize_reddit_client(self) -> FakeReddit:
+        return self._fake_reddit
+    
+    def _initialize_background_client(self) -> FakeReddit:
+        # The fake serializes its own state, so threads can share it
+        return self._fake_reddit
@@ -0,0 +1,123 @@
+"""
+Fingerprint Index
+-----------------
+Persistent record of recently posted content, for skipping duplicates.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger("RedditAgent.fingerprints")
+
+# Posts older than this no longer count as duplicates, in seconds
+DEFAULT_LOOKBACK = 30 * 86400
+
+_WHITESPACE = re.compile(r"\s+")
+# Query parameters that only track where a click came from
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|ref|ref_src)$", re.IGNORECASE)
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", value or "").strip().casefold()
+
+
+def _normalize_url(url: Optional[str]) -> str:
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not _TRACKING_PARAMS.match(key))
+    # http/https and a trailing slash or fragment don't make a link different
+    return urlunsplit(("", host, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+def fingerprint(post_config: Dict[str, Any]) -> str:
+    """Hash of a post's normalized subreddit, title, body, link and image.
+
+    Case, runs of whitespace, the URL scheme, ``www.``, trailing slashes,
+    fragments and tracking parameters are ignored, so trivially edited
+    copies of the same post share a fingerprint.
+    """
+    canonical = "\x1f".join((
+        (post_config.get("subreddit") or "").lower(),
+        _normalize_text(post_config.get("title")),
+        _normalize_text(post_config.get("content")),
+        _normalize_url(post_config.get("url")),
+        post_config.get("image_path") or "",
+    ))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class FingerprintIndex:
+    """SQLite table of fingerprints of posts made within the last ``lookback`` seconds.
+
+    Shared by every run (and resume) that points at the same ``db_path``,
+    so a campaign file posted again, or merged with one that overlaps it,
+    does not repeat content that is already live.
+    """
+
+    def __init__(self, db_path: str = "fingerprints.db",
+                 lookback: float = DEFAULT_LOOKBACK,
+                 clock: Callable[[], float] = time.time):
+        self.db_path = db_path
+        self.lookback = lookback
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                fingerprint TEXT PRIMARY KEY,
+                subreddit TEXT,
+                post_id TEXT,
+                post_url TEXT,
+                posted_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS fingerprints_posted_at ON fingerprints (posted_at)")
+        self.prune()
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """The post recorded under a fingerprint within the lookback window, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT post_id, post_url, posted_at FROM fingerprints WHERE fingerprint = ? AND posted_at >= ?",
+                (key, self._clock() - self.lookback)).fetchone()
+        if row is None:
+            return None
+        return {"post_id": row[0], "post_url": row[1], "posted_at": row[2]}
+
+    def add(self, key: str, subreddit: Optional[str] = None, post_id: Optional[str] = None,
+            post_url: Optional[str] = None, posted_at: Optional[float] = None) -> None:
+        """Record a post under its fingerprint, replacing any older record."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (fingerprint, subreddit, post_id, post_url, posted_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, subreddit, post_id, post_url, self._clock() if posted_at is None else posted_at))
+
+    def prune(self) -> int:
+        """Forget fingerprints older than the lookback window. Returns how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM fingerprints WHERE posted_at < ?",
+                                        (self._clock() - self.lookback,))
+        if cursor.rowcount:
+            logger.info("Pruned %d expired post fingerprints", cursor.rowcount)
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
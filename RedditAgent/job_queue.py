@@ -0,0 +1,166 @@
+"""
+Job Queue
+---------
+Durable SQLite-backed queue of campaign posts for resumable runs.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger("RedditAgent.jobs")
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# Config fields that define what gets posted, and so the idempotency key
+KEY_FIELDS = ("subreddit", "title", "content", "url", "image_path")
+
+
+class JobQueue:
+    """One row per campaign post, moving through pending -> in_flight -> done/failed.
+
+    Posts skipped as duplicates of already-posted content go straight from
+    pending to skipped, and posts waiting for a retry are back in pending.
+
+    Each row is keyed by an idempotency key derived from the post's content,
+    so enqueueing the same config again never creates a second job (and two
+    identical items in one config are posted once). A job is marked
+    in-flight right before its submission and done or failed right after,
+    so a crashed run can be resumed without reposting finished work.
+    """
+
+    def __init__(self, db_path: str = "jobs.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                config TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                post_id TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id)")
+
+    @staticmethod
+    def idempotency_key(post_config: Dict[str, Any]) -> str:
+        """Return a stable key for a config item's content."""
+        canonical = json.dumps({field: post_config.get(field) for field in KEY_FIELDS},
+                               sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def enqueue(self, posts_config: Iterable[Dict[str, Any]], batch_size: int = 500) -> int:
+        """Add config items as pending jobs, skipping any already queued. Returns the number added."""
+        added = 0
+        batch = []
+
+        def flush():
+            nonlocal added
+            with self._lock:
+                before = self._conn.total_changes
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (idempotency_key, config, updated_at) VALUES (?, ?, ?)",
+                    batch)
+                self._conn.execute("COMMIT")
+                added += self._conn.total_changes - before
+            batch.clear()
+
+        for post_config in posts_config:
+            batch.append((self.idempotency_key(post_config),
+                          json.dumps(post_config, separators=(',', ':')),
+                          time.time()))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        return added
+
+    def recover_interrupted(self) -> int:
+        """Mark jobs left in flight by a crashed run as failed.
+
+        Whether their submission reached Reddit is unknown, so they are not
+        retried automatically; that would risk a duplicate post.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE state = ?",
+                (FAILED, "Interrupted before the result was recorded; check Reddit before retrying",
+                 time.time(), IN_FLIGHT))
+        return cursor.rowcount
+
+    def retry_failed(self) -> int:
+        """Move failed jobs back to pending."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ?, updated_at = ? WHERE state = ?",
+                (PENDING, time.time(), FAILED))
+        return cursor.rowcount
+
+    def pending(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yield pending jobs in queue order as config dicts carrying their ``job_key``."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, idempotency_key, config FROM jobs WHERE state = ? AND id > ? ORDER BY id LIMIT ?",
+                    (PENDING, last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            for job_id, key, config in rows:
+                last_id = job_id
+                post_config = json.loads(config)
+                post_config["job_key"] = key
+                yield post_config
+
+    def _set_state(self, key: str, state: str, post_id: Optional[str] = None,
+                   error: Optional[str] = None, attempt: bool = False) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, post_id = COALESCE(?, post_id), error = ?, "
+                "attempts = attempts + ?, updated_at = ? WHERE idempotency_key = ?",
+                (state, post_id, error, 1 if attempt else 0, time.time(), key))
+
+    def mark_in_flight(self, key: str) -> None:
+        self._set_state(key, IN_FLIGHT, attempt=True)
+
+    def mark_result(self, key: str, event: Dict[str, Any]) -> None:
+        """Record a post's outcome from its event."""
+        if event.get("status") == "success":
+            self._set_state(key, DONE, post_id=event.get("post_id"))
+        elif event.get("status") == "retry_scheduled":
+            # The attempt failed for certain, so a resumed run may safely try again
+            self._set_state(key, PENDING, error=event.get("error"))
+        elif event.get("status") == "skipped_duplicate":
+            self._set_state(key, SKIPPED, post_id=(event.get("duplicate_of") or {}).get("post_id"))
+        else:
+            self._set_state(key, FAILED, error=event.get("error"))
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state."""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def clear(self) -> None:
+        """Remove every job."""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
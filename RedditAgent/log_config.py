@@ -0,0 +1,78 @@
+"""
+Logging Setup
+-------------
+Queue-backed logging so the posting thread never waits on log I/O.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime
+from typing import Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Event fields copied onto structured records passed as extra={"event": ...}
+EVENT_FIELDS = ("event_id", "tenant", "action", "subreddit", "title", "status", "error_class", "post_id", "post_url", "error", "timings")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including the fields of any attached event."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        event = getattr(record, "event", None)
+        if isinstance(event, dict):
+            entry.update((field, event[field]) for field in EVENT_FIELDS if field in event)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(log_file: Optional[str] = "reddit_agent.log",
+                      level: int = logging.INFO,
+                      json_format: bool = False,
+                      max_bytes: int = 10 * 1024 * 1024,
+                      backup_count: int = 5,
+                      console: bool = True) -> logging.handlers.QueueListener:
+    """Route the ``RedditAgent`` loggers through a queue drained by a background thread.
+
+    Records go to ``log_file`` (rotated at ``max_bytes``, keeping
+    ``backup_count`` old files) and, with ``console``, to stderr. Only the
+    first call in a process takes effect; later calls return the same listener.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+        handlers = []
+        if log_file:
+            handlers.append(logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"))
+        if console:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        logger = logging.getLogger("RedditAgent")
+        logger.setLevel(level)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Flush whatever is still queued when the process exits
+        atexit.register(_listener.stop)
+        return _listener
@@ -0,0 +1,144 @@
+"""
+Media Cache
+-----------
+Content-addressed preprocessing cache for images posted by the Reddit agent.
+"""
+import hashlib
+import os
+import threading
+import time
+import logging
+from typing import Dict, Tuple
+
+logger = logging.getLogger("RedditAgent.media")
+
+# Formats that are re-encoded when they need to shrink; others (e.g. animated GIF) pass through
+RESIZABLE_FORMATS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+_pillow = None
+
+
+def _load_pillow():
+    """Import Pillow on first use; returns ``None`` when it is not installed."""
+    global _pillow
+    if _pillow is None:
+        try:
+            from PIL import Image
+            _pillow = Image
+        except ImportError:  # Pillow is optional; without it images are uploaded as-is
+            logger.warning("Pillow is not installed; images will be uploaded without resizing")
+            _pillow = False
+    return _pillow or None
+
+
+class MediaCache:
+    """Fingerprints images by content and caches a size-bounded version on disk.
+
+    Images larger than ``max_dimension`` pixels on a side or ``max_bytes`` on
+    disk are downscaled and recompressed (requires Pillow); smaller ones are
+    used unchanged. Results are keyed by the SHA-256 of the source bytes and
+    the target settings, so the same creative posted to many subreddits is
+    processed once. Within ``reuse_window`` seconds a repeat request for the
+    same file is answered from memory without touching the disk again.
+    """
+
+    def __init__(self,
+                 cache_dir: str = ".media_cache",
+                 max_dimension: int = 2048,
+                 max_bytes: int = 5 * 1024 * 1024,
+                 jpeg_quality: int = 85,
+                 reuse_window: float = 3600):
+        self.cache_dir = cache_dir
+        self.max_dimension = max_dimension
+        self.max_bytes = max_bytes
+        self.jpeg_quality = jpeg_quality
+        self.reuse_window = reuse_window
+        self._lock = threading.Lock()
+        # (path, size, mtime_ns) -> content hash
+        self._fingerprints: Dict[Tuple[str, int, int], str] = {}
+        # content hash -> (prepared path, prepared at)
+        self._prepared: Dict[str, Tuple[str, float]] = {}
+
+    def fingerprint(self, image_path: str) -> str:
+        """Return the SHA-256 of a file's contents, memoized by path, size and mtime."""
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._fingerprints.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(image_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            with self._lock:
+                self._fingerprints[key] = digest
+        return digest
+
+    def prepare(self, image_path: str) -> str:
+        """Return the path of an upload-ready version of ``image_path``."""
+        digest = self.fingerprint(image_path)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._prepared.get(digest)
+        if cached and now - cached[1] < self.reuse_window and os.path.exists(cached[0]):
+            return cached[0]
+
+        prepared = self._prepare_uncached(image_path, digest)
+        with self._lock:
+            self._prepared[digest] = (prepared, now)
+        return prepared
+
+    def _artifact_path(self, digest: str, extension: str) -> str:
+        name = f"{digest}-{self.max_dimension}-{self.jpeg_quality}{extension}"
+        return os.path.join(self.cache_dir, name)
+
+    def _prepare_uncached(self, image_path: str, digest: str) -> str:
+        Image = _load_pillow()
+        if Image is None:
+            return image_path
+
+        for extension in set(RESIZABLE_FORMATS.values()):
+            artifact = self._artifact_path(digest, extension)
+            if os.path.exists(artifact):
+                return artifact
+
+        try:
+            with Image.open(image_path) as image:
+                image_format = image.format
+                oversized = (max(image.size) > self.max_dimension
+                             or os.path.getsize(image_path) > self.max_bytes)
+                if image_format not in RESIZABLE_FORMATS or not oversized:
+                    return image_path
+                if getattr(image, "is_animated", False):
+                    return image_path
+
+                image.thumbnail((self.max_dimension, self.max_dimension))
+                # JPEG is by far the smallest for photos; keep PNG/WEBP when there is transparency
+                if image_format == "PNG" and image.mode not in ("RGBA", "LA", "P"):
+                    image_format = "JPEG"
+                if image_format == "JPEG" and image.mode != "RGB":
+                    image = image.convert("RGB")
+
+                os.makedirs(self.cache_dir, exist_ok=True)
+                artifact = self._artifact_path(digest, RESIZABLE_FORMATS[image_format])
+                tmp = artifact + ".tmp"
+                options = {"optimize": True}
+                if image_format in ("JPEG", "WEBP"):
+                    options["quality"] = self.jpeg_quality
+                image.save(tmp, format=image_format, **options)
+                os.replace(tmp, artifact)
+        except OSError as e:
+            logger.warning("Could not preprocess %s, uploading original: %s", image_path, e)
+            return image_path
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Prepared %s as %s (%d -> %d bytes)", image_path, artifact,
+                        os.path.getsize(image_path), os.path.getsize(artifact))
+        return artifact
+
+    def clear(self) -> None:
+        """Forget in-memory fingerprints and reuse entries (files on disk are kept)."""
+        with self._lock:
+            self._fingerprints.clear()
+            self._prepared.clear()
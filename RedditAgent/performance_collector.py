@@ -0,0 +1,181 @@
+"""
+Performance Collector
+---------------------
+Background polling of submitted posts' score, comments and removal status,
+batched into multi-fullname info lookups.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("RedditAgent.performance")
+
+# (maximum post age, polling interval) in seconds: frequent while a post is
+# fresh, rarer as it ages, and not at all after the last age
+DECAY_SCHEDULE = (
+    (3600, 300),
+    (6 * 3600, 1800),
+    (24 * 3600, 3 * 3600),
+    (7 * 86400, 12 * 3600),
+)
+# Reddit's /api/info accepts at most this many fullnames per request
+INFO_BATCH_SIZE = 100
+# Delay after a failed lookup, doubling per consecutive failure up to the maximum
+FAILURE_BACKOFF = 60
+MAX_FAILURE_BACKOFF = 3600
+
+
+class PerformanceCollector:
+    """Polls tracked submissions in batches and reports their metrics.
+
+    Each tracked post is due again after the interval its age falls into in
+    ``schedule``. Posts due within ``coalesce`` seconds are pulled forward
+    so lookups go out in full batches of ``batch_size``. ``on_metrics`` is
+    called with ``(context, metrics)`` for every submission checked, where
+    ``context`` is whatever was passed to ``track``; the latest metrics per
+    post are also kept in ``latest``. When a lookup fails, the posts in
+    that batch are put off by a delay that doubles with each consecutive
+    failure, so outages and rate limits are not polled in a tight loop.
+    """
+
+    def __init__(self,
+                 reddit,
+                 on_metrics: Callable[[Dict[str, Any], Dict[str, Any]], None],
+                 schedule: Tuple[Tuple[float, float], ...] = DECAY_SCHEDULE,
+                 batch_size: int = INFO_BATCH_SIZE,
+                 coalesce: float = 60,
+                 clock: Callable[[], float] = time.time):
+        self.reddit = reddit
+        self.on_metrics = on_metrics
+        self.schedule = schedule
+        self.batch_size = min(batch_size, INFO_BATCH_SIZE)
+        self.coalesce = coalesce
+        self._clock = clock
+        # fullname -> [posted_at, next_due, context]
+        self._tracked: Dict[str, list] = {}
+        self.latest: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _interval(self, age: float) -> Optional[float]:
+        for max_age, interval in self.schedule:
+            if age < max_age:
+                return interval
+        return None
+
+    def track(self, post_id: str, context: Optional[Dict[str, Any]] = None,
+              posted_at: Optional[float] = None) -> None:
+        """Start polling a submission, first after the schedule's shortest interval."""
+        posted_at = self._clock() if posted_at is None else posted_at
+        fullname = post_id if post_id.startswith("t3_") else f"t3_{post_id}"
+        first = self._interval(0)
+        if first is None:
+            return
+        with self._lock:
+            self._tracked[fullname] = [posted_at, posted_at + first, context or {}]
+        self._wake.set()
+
+    def __len__(self) -> int:
+        return len(self._tracked)
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            return min((entry[1] for entry in self._tracked.values()), default=None)
+
+    def _due(self, now: float) -> List[str]:
+        with self._lock:
+            due = [(entry[1], fullname) for fullname, entry in self._tracked.items()
+                   if entry[1] <= now + self.coalesce]
+        due.sort()
+        # Only pull posts forward to fill a batch, never to start an extra one
+        overdue = sum(1 for next_due, _ in due if next_due <= now)
+        if not overdue:
+            return []
+        batches = -(-overdue // self.batch_size)
+        return [fullname for _, fullname in due[:batches * self.batch_size]]
+
+    @staticmethod
+    def _metrics(submission, checked_at: float) -> Dict[str, Any]:
+        removed_by = getattr(submission, "removed_by_category", None)
+        return {
+            "score": getattr(submission, "score", None),
+            "upvote_ratio": getattr(submission, "upvote_ratio", None),
+            "num_comments": getattr(submission, "num_comments", None),
+            "removed": removed_by is not None,
+            "removed_by_category": removed_by,
+            "checked_at": datetime.fromtimestamp(checked_at).isoformat(),
+        }
+
+    def collect(self, now: Optional[float] = None) -> int:
+        """Look up every due submission; returns how many were checked."""
+        now = self._clock() if now is None else now
+        due = self._due(now)
+        checked = 0
+        for start in range(0, len(due), self.batch_size):
+            batch = due[start:start + self.batch_size]
+            try:
+                submissions = list(self.reddit.info(fullnames=batch))
+            except Exception as e:
+                self.failures += 1
+                backoff = min(FAILURE_BACKOFF * 2 ** (self.failures - 1), MAX_FAILURE_BACKOFF)
+                logger.warning("Performance lookup for %d posts failed, retrying in %d s: %s",
+                               len(batch), backoff, e)
+                with self._lock:
+                    for fullname in batch:
+                        entry = self._tracked.get(fullname)
+                        if entry is not None:
+                            entry[1] = max(entry[1], now + backoff)
+                continue
+            self.failures = 0
+            self.requests += 1
+            found = {submission.fullname: submission for submission in submissions}
+            for fullname in batch:
+                with self._lock:
+                    entry = self._tracked.get(fullname)
+                if entry is None:
+                    continue
+                posted_at, _, context = entry
+                submission = found.get(fullname)
+                if submission is None:
+                    # Deleted posts drop out of info results entirely
+                    metrics = {"removed": True, "removed_by_category": "deleted",
+                               "checked_at": datetime.fromtimestamp(now).isoformat()}
+                else:
+                    metrics = self._metrics(submission, now)
+                self.latest[fullname] = metrics
+                interval = None if submission is None else self._interval(now - posted_at)
+                with self._lock:
+                    if interval is None:
+                        self._tracked.pop(fullname, None)
+                    else:
+                        entry[1] = now + interval
+                checked += 1
+                try:
+                    self.on_metrics(context, metrics)
+                except Exception as e:
+                    logger.warning("Recording metrics for %s failed: %s", fullname, e)
+        return checked
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.collect()
+            next_due = self.next_due()
+            delay = 60.0 if next_due is None else max(next_due - self._clock(), 1.0)
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def start(self) -> "PerformanceCollector":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="performance-collector", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
@@ -0,0 +1,250 @@
+"""
+Post Scheduler
+--------------
+Rate-limit-aware ordering of posts for the Reddit posting agent.
+"""
+import heapq
+import itertools
+import random
+import time
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("RedditAgent.scheduler")
+
+# Reddit's published OAuth limit: 100 queries per minute per client
+REDDIT_QUERIES_PER_MINUTE = 100
+
+
+class TokenBucket:
+    """Global API request budget.
+
+    Refills continuously at ``rate`` tokens per second up to ``capacity``.
+    When Reddit reports its own view of the budget (``remaining`` and
+    ``reset_timestamp`` from the rate-limit headers PRAW tracks), the bucket
+    never assumes more tokens than Reddit says are left, and waits for the
+    reset once they run out.
+    """
+
+    def __init__(self,
+                 rate: float = REDDIT_QUERIES_PER_MINUTE / 60.0,
+                 capacity: float = REDDIT_QUERIES_PER_MINUTE,
+                 clock: Callable[[], float] = time.monotonic,
+                 wall_clock: Callable[[], float] = time.time):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._server_remaining = None
+        self._server_reset = None
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._server_reset is not None and now >= self._server_reset:
+            # Reddit's window has rolled over; its old count no longer applies
+            self._server_remaining = None
+            self._server_reset = None
+
+    def update_from_limits(self, limits: Optional[Dict[str, Any]]) -> None:
+        """Sync with ``reddit.auth.limits`` after a request."""
+        if not limits or limits.get("remaining") is None:
+            return
+        self._refill()
+        self._server_remaining = float(limits["remaining"])
+        self._tokens = min(self._tokens, self._server_remaining)
+        reset_timestamp = limits.get("reset_timestamp")
+        if reset_timestamp is not None:
+            self._server_reset = self._clock() + max(0.0, reset_timestamp - self._wall_clock())
+
+    def wait_time(self, cost: float = 1) -> float:
+        """Seconds until ``cost`` tokens are available."""
+        self._refill()
+        if self._server_remaining is not None and self._server_remaining < cost:
+            if self._server_reset is not None:
+                return max(0.0, self._server_reset - self._clock())
+        if self._tokens >= cost:
+            return 0.0
+        return (cost - self._tokens) / self.rate
+
+    def consume(self, cost: float = 1) -> None:
+        self._refill()
+        self._tokens -= cost
+        if self._server_remaining is not None:
+            self._server_remaining -= cost
+
+
+class PostScheduler:
+    """Orders queued posts to respect spacing rules with minimal idle time.
+
+    Posts to the same subreddit are spaced by a random delay drawn from
+    ``delay_range``; posts to different subreddits only need ``min_interval``
+    between them and enough budget in the global token bucket. Among the
+    next ``window`` queued items, the one that becomes eligible soonest is
+    released next (ties go to the earliest queued), and posts to a given
+    subreddit keep their relative order. Posts handed back with ``defer``
+    are held until their retry time, then go first in their subreddit.
+    """
+
+    def __init__(self,
+                 delay_range: Tuple[float, float] = (30, 120),
+                 min_interval: float = 0,
+                 requests_per_post: float = 2,
+                 bucket: Optional[TokenBucket] = None,
+                 window: int = 256,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 rng: Optional[random.Random] = None):
+        self.delay_range = delay_range
+        self.min_interval = min_interval
+        self.requests_per_post = requests_per_post
+        self.bucket = bucket or TokenBucket(clock=clock)
+        self.window = window
+        self._clock = clock
+        self._sleep = sleep
+        self._random = rng or random
+        # subreddit -> queued items, in arrival order of each subreddit's oldest item
+        self._queues = OrderedDict()
+        self._queued = 0
+        # Deferred posts as a heap of (not_before, sequence, post_config)
+        self._deferred = []
+        self._deferred_seq = itertools.count()
+        self._paused_until = float("-inf")
+        self._next_allowed = {}
+        self._last_release = None
+        # Seconds slept before the most recently released post
+        self.last_wait = 0.0
+
+    @staticmethod
+    def _key(post_config: Dict[str, Any]) -> str:
+        return (post_config.get("subreddit") or "").lower()
+
+    def add(self, post_config: Dict[str, Any]) -> None:
+        """Queue a post."""
+        self._queues.setdefault(self._key(post_config), deque()).append(post_config)
+        self._queued += 1
+
+    def defer(self, post_config: Dict[str, Any], delay: float) -> None:
+        """Queue a post again, to go out no sooner than ``delay`` seconds from now."""
+        heapq.heappush(self._deferred, (self._clock() + delay, next(self._deferred_seq), post_config))
+        self._queued += 1
+
+    def pause(self, delay: float) -> None:
+        """Hold every post for at least ``delay`` seconds, e.g. after an account-wide rate limit."""
+        self._paused_until = max(self._paused_until, self._clock() + delay)
+
+    def __len__(self) -> int:
+        return self._queued
+
+    def _release_deferred(self) -> None:
+        now = self._clock()
+        while self._deferred and self._deferred[0][0] <= now:
+            _, _, post_config = heapq.heappop(self._deferred)
+            self._queues.setdefault(self._key(post_config), deque()).appendleft(post_config)
+
+    def _ready_at(self, key: str) -> float:
+        ready = max(self._next_allowed.get(key, float("-inf")), self._paused_until)
+        if self._last_release is not None:
+            ready = max(ready, self._last_release + self.min_interval)
+        return ready
+
+    def _pick(self) -> Tuple[Optional[str], float]:
+        best_key, best_ready = None, float("inf")
+        for key in self._queues:
+            ready = self._ready_at(key)
+            # Strict comparison keeps ties with the earliest-queued subreddit
+            if best_key is None or ready < best_ready:
+                best_key, best_ready = key, ready
+        return best_key, best_ready
+
+    def peek(self, count: int) -> List[Dict[str, Any]]:
+        """Return up to ``count`` queued posts in the order they are expected to go out.
+
+        This is an estimate: spacing for a subreddit only starts once its
+        current post is recorded.
+        """
+        heads = sorted(self._queues.items(), key=lambda item: self._ready_at(item[0]))
+        upcoming = []
+        depth = 0
+        while len(upcoming) < count and heads:
+            remaining = []
+            for key, queue in heads:
+                if depth < len(queue):
+                    upcoming.append(queue[depth])
+                    remaining.append((key, queue))
+                    if len(upcoming) >= count:
+                        break
+            heads = remaining
+            depth += 1
+        return upcoming
+
+    def next_post(self, before_wait: Optional[Callable[["PostScheduler"], None]] = None) -> Dict[str, Any]:
+        """Wait until the best queued post may go out, then dequeue and return it.
+
+        ``before_wait`` is called with the scheduler just before any waiting,
+        so callers can use the idle time (for example to prefetch ``peek``).
+        """
+        if before_wait:
+            before_wait(self)
+        self.last_wait = 0.0
+        self._release_deferred()
+        key, ready = self._pick()
+        while self._deferred and self._deferred[0][0] < ready:
+            # A deferred post comes due before anything queued could go
+            wait = max(0.0, self._deferred[0][0] - self._clock())
+            self.last_wait += wait
+            if wait > 0:
+                logger.info("Waiting %.1f seconds to retry a post...", wait)
+                self._sleep(wait)
+            self._release_deferred()
+            key, ready = self._pick()
+        
+        now = self._clock()
+        wait = max(0.0, ready - now, self.bucket.wait_time(self.requests_per_post))
+        self.last_wait += wait
+        if wait > 0:
+            logger.info("Waiting %.1f seconds before next post...", wait)
+            self._sleep(wait)
+
+        queue = self._queues[key]
+        post_config = queue.popleft()
+        if not queue:
+            del self._queues[key]
+        self._queued -= 1
+        self.bucket.consume(self.requests_per_post)
+        self._last_release = self._clock()
+        return post_config
+
+    def record_post(self, post_config: Dict[str, Any]) -> None:
+        """Start the spacing interval for a subreddit after a submission."""
+        delay = self._random.uniform(self.delay_range[0], self.delay_range[1])
+        self._next_allowed[self._key(post_config)] = self._clock() + delay
+
+    def update_rate_limits(self, limits: Optional[Dict[str, Any]]) -> None:
+        """Feed Reddit's rate-limit headers into the global budget."""
+        self.bucket.update_from_limits(limits)
+
+    def schedule(self,
+                 posts_config: Iterable[Dict[str, Any]],
+                 before_wait: Optional[Callable[["PostScheduler"], None]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield posts from ``posts_config`` in schedule order, sleeping as needed.
+
+        Items are pulled lazily so at most ``window`` are buffered (deferred
+        posts included). Callers should call ``record_post`` after each
+        submission, and may ``defer`` a post to have it yielded again later.
+        """
+        source = iter(posts_config)
+        exhausted = False
+        while True:
+            while not exhausted and self._queued < self.window:
+                try:
+                    self.add(next(source))
+                except StopIteration:
+                    exhausted = True
+            if not self._queued:
+                return
+            yield self.next_post(before_wait)
@@ -3,34 +3,178 @@ Reddit Posting Agent
 -------------------
 A simple agent that posts content to specified subreddits.
 """
-import praw
 import time
 import json
 import os
 import logging
-import random
+import threading
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Union
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("reddit_agent.log"),
-        logging.StreamHandler()
-    ]
-)
+from typing import TYPE_CHECKING, List, Dict, Any, Callable, Iterable, Optional, Tuple, Union
+
+from event_journal import EventJournal
+from event_record import EventRecord
+from fingerprint_index import DEFAULT_LOOKBACK, FingerprintIndex, fingerprint
+from log_config import configure_logging
+from media_cache import MediaCache
+from metrics import REGISTRY
+from performance_collector import PerformanceCollector
+from post_scheduler import PostScheduler, TokenBucket
+from retry_policy import PERMANENT, RATE_LIMITED, RetryPolicy, classify_error
+from token_store import TokenRefresher, TokenStore, credentials_key, shared_session
+
+if TYPE_CHECKING:
+    import praw
+
 logger = logging.getLogger("RedditAgent")
 
+# Phase timings travel on the events; the dashboard turns them into a histogram
+POSTS_TOTAL = REGISTRY.counter("reddit_agent_posts_total",
+                               "Post attempts by outcome",
+                               labels=("status",))
+
+def _is_access_error(error: Exception, include_redirect: bool = False) -> bool:
+    """Whether ``error`` is Reddit refusing access to, or not finding, a subreddit."""
+    # prawcore is already loaded whenever one of its exceptions exists
+    from prawcore.exceptions import Forbidden, NotFound, Redirect
+    
+    types = (Forbidden, NotFound, Redirect) if include_redirect else (Forbidden, NotFound)
+    return isinstance(error, types)
+
+class SubredditCache:
+    """Size-bounded TTL cache of subreddit validation results.
+
+    Valid subreddits are stored with their resolved ``Subreddit`` object so it
+    can be reused for submission. Subreddits that are banned or do not exist
+    are cached as ``None`` for a shorter, separate TTL.
+    """
+
+    def __init__(self, ttl: float = 3600, negative_ttl: float = 600, max_entries: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        # Callers may share an agent across threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(subreddit_name: str) -> str:
+        return subreddit_name.lower()
+
+    def get(self, subreddit_name: str) -> Tuple[bool, Optional[Any]]:
+        """Return ``(hit, subreddit)``; ``subreddit`` is ``None`` for a cached failure."""
+        key = self._key(subreddit_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, subreddit = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, subreddit
+
+    def put(self, subreddit_name: str, subreddit: Optional[Any]) -> None:
+        """Cache a resolved subreddit, or ``None`` to cache a failed validation."""
+        key = self._key(subreddit_name)
+        ttl = self.ttl if subreddit is not None else self.negative_ttl
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, subreddit)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subreddit_name: str) -> None:
+        """Drop any cached result for a subreddit."""
+        with self._lock:
+            self._entries.pop(self._key(subreddit_name), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
 class RedditPostingAgent:
     """Agent for posting content to Reddit subreddits."""
     
-    def __init__(self, credentials_file: str = "credentials.json"):
-        """Initialize the Reddit agent with credentials."""
+    def __init__(self,
+                 credentials_file: str = "credentials.json",
+                 subreddit_cache_ttl: float = 3600,
+                 subreddit_negative_ttl: float = 600,
+                 subreddit_cache_size: int = 1024,
+                 journal_file: str = "events.jsonl",
+                 max_events_in_memory: int = 10000,
+                 media_cache: Optional[MediaCache] = None,
+                 event_bus: Optional[Any] = None,
+                 log_file: Optional[str] = "reddit_agent.log",
+                 log_level: int = logging.INFO,
+                 log_json: bool = False,
+                 tenant: Optional[str] = None,
+                 token_file: Optional[str] = ".reddit_tokens.json",
+                 collect_performance: bool = True,
+                 duplicate_index: Optional[str] = "fingerprints.db",
+                 duplicate_lookback: float = DEFAULT_LOOKBACK,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 clock: Callable[[], float] = time.time,
+                 timer: Callable[[], float] = time.perf_counter,
+                 sleep: Callable[[float], None] = time.sleep):
+        """Initialize the Reddit agent with credentials.
+
+        Every event is appended to ``journal_file`` as it happens; only the
+        most recent ``max_events_in_memory`` are also kept in memory, as
+        compact ``EventRecord`` objects. Images
+        go through ``media_cache`` (a default ``MediaCache`` if not given).
+        Events are also published to ``event_bus`` (anything with a
+        ``publish(event)`` method, e.g. ``EventBus`` or ``UnixSocketPublisher``)
+        as they happen.
+
+        Logging is set up here, once per process: records are handed to a
+        background thread and written to ``log_file`` (size-rotated), as JSON
+        lines carrying the post's event fields when ``log_json`` is set.
+        ``tenant`` tags every event when several clients share one event sink.
+        OAuth tokens are cached in ``token_file`` (``None`` disables it) and
+        refreshed in the background before they expire. With
+        ``collect_performance``, successful posts are polled in the background
+        for score, comments and removal, recorded as ``post_metrics`` events;
+        the polling thread gets its own client, since PRAW is not thread-safe.
+        Fingerprints of successful posts are kept in ``duplicate_index``
+        (``None`` disables it) so ``batch_post`` skips content already posted
+        to the same subreddit within ``duplicate_lookback`` seconds.
+        ``retry_policy`` decides which failed posts ``batch_post`` tries again
+        and when (a default ``RetryPolicy`` if not given).
+
+        ``clock`` (wall time for event timestamps), ``timer`` (monotonic, for
+        phase timings and cache expiry) and ``sleep`` can be replaced with a
+        virtual clock to simulate a campaign without waiting for it.
+        """
+        self._clock = clock
+        self._timer = timer
+        self._sleep = sleep
+        configure_logging(log_file, level=log_level, json_format=log_json)
         self.credentials = self._load_credentials(credentials_file)
+        self.token_store = TokenStore(token_file) if token_file else None
+        self.token_refresher = None
         self.reddit = self._initialize_reddit_client()
-        self.events = []
+        self.subreddit_cache = SubredditCache(
+            ttl=subreddit_cache_ttl,
+            negative_ttl=subreddit_negative_ttl,
+            max_entries=subreddit_cache_size,
+            clock=timer
+        )
+        self.media_cache = media_cache or MediaCache()
+        self.journal = EventJournal(journal_file)
+        self.event_bus = event_bus
+        self.tenant = tenant
+        self.events = deque(maxlen=max_events_in_memory)
+        self.performance = PerformanceCollector(self._initialize_background_client(), self._record_metrics,
+                                                clock=clock) if collect_performance else None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.fingerprints = FingerprintIndex(duplicate_index, lookback=duplicate_lookback, clock=clock) if duplicate_index else None
         logger.info("Reddit Posting Agent initialized")
         
     def _load_credentials(self, credentials_file: str) -> Dict[str, str]:
@@ -39,127 +183,466 @@ class RedditPostingAgent:
             with open(credentials_file, 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
-            logger.error(f"Credentials file {credentials_file} not found")
+            logger.error("Credentials file %s not found", credentials_file)
             raise
             
-    def _initialize_reddit_client(self) -> praw.Reddit:
-        """Initialize and return a Reddit client."""
+    def _create_reddit_client(self, session) -> "praw.Reddit":
+        """Build a Reddit client on ``session``, with tokens going through the token store."""
+        # Imported here so tools that never talk to Reddit don't pay for it
+        import praw
+        
         try:
-            return praw.Reddit(
+            reddit = praw.Reddit(
                 client_id=self.credentials.get("client_id"),
                 client_secret=self.credentials.get("client_secret"),
                 user_agent=self.credentials.get("user_agent"),
                 username=self.credentials.get("username"),
-                password=self.credentials.get("password")
+                password=self.credentials.get("password"),
+                requestor_kwargs={"session": session}
             )
         except Exception as e:
-            logger.error(f"Failed to initialize Reddit client: {str(e)}")
+            logger.error("Failed to initialize Reddit client: %s", e)
             raise
+        
+        authorizer = getattr(getattr(reddit, "_authorized_core", None), "_authorizer", None)
+        if self.token_store is not None and authorizer is not None:
+            refresher = TokenRefresher(authorizer, self.token_store, credentials_key(self.credentials))
+            refresher.install()
+            if self.token_refresher is None:
+                self.token_refresher = refresher.start()
+        return reddit
     
-    def validate_subreddit(self, subreddit_name: str) -> bool:
-        """Check if a subreddit exists and is accessible."""
+    def _initialize_reddit_client(self) -> "praw.Reddit":
+        """Initialize and return the Reddit client used for posting."""
+        # Agents with the same credentials share kept-alive connections
+        return self._create_reddit_client(shared_session(credentials_key(self.credentials)))
+    
+    def _initialize_background_client(self) -> "praw.Reddit":
+        """A separate Reddit client for background threads.
+
+        PRAW clients, their rate limiter and lazy models are not safe to use
+        from several threads, so nothing but the posting thread touches
+        ``self.reddit``. The token is shared through the token store, but
+        the client gets its own connections.
+        """
+        import requests
+        
+        return self._create_reddit_client(requests.Session())
+    
+    def resolve_subreddit(self, subreddit_name: str) -> Optional[Any]:
+        """Return a validated ``Subreddit`` object, or ``None`` if it is not usable.
+
+        Results are served from the subreddit cache while fresh. Banned,
+        private and nonexistent subreddits are negatively cached. Other errors
+        (network failures, server errors) are not cached and are raised, so
+        the caller can tell an outage from a subreddit that refuses posts.
+        """
+        hit, subreddit = self.subreddit_cache.get(subreddit_name)
+        if hit:
+            return subreddit
+
         try:
             subreddit = self.reddit.subreddit(subreddit_name)
-            # Try to access a property to verify the subreddit exists
-            subreddit.display_name
-            return True
+            # Access a lazy attribute to force a fetch and verify the subreddit exists
+            subreddit.subreddit_type
+            if getattr(subreddit, "user_is_banned", False):
+                logger.warning("Subreddit validation failed for %s: account is banned", subreddit_name)
+                self.subreddit_cache.put(subreddit_name, None)
+                return None
         except Exception as e:
-            logger.warning(f"Subreddit validation failed for {subreddit_name}: {str(e)}")
+            logger.warning("Subreddit validation failed for %s: %s", subreddit_name, e)
+            if not _is_access_error(e, include_redirect=True):
+                raise
+            self.subreddit_cache.put(subreddit_name, None)
+            return None
+
+        self.subreddit_cache.put(subreddit_name, subreddit)
+        return subreddit
+
+    def validate_subreddit(self, subreddit_name: str) -> bool:
+        """Check if a subreddit exists and is accessible."""
+        try:
+            return self.resolve_subreddit(subreddit_name) is not None
+        except Exception:
             return False
     
+    def prepare_post(self,
+                     subreddit_name: str,
+                     title: str,
+                     content: str = None,
+                     url: str = None,
+                     image_path: str = None) -> Dict[str, Any]:
+        """Do everything for a post except the submit call.
+
+        Resolves (and validates) the subreddit, then builds the payload with
+        ``prepare_payload``. Phase durations are returned under ``timings``.
+        """
+        started = self._timer()
+        subreddit = self.resolve_subreddit(subreddit_name)
+        validate = self._timer() - started
+        prepared = self.prepare_payload(title, content, url, image_path)
+        prepared["subreddit"] = subreddit
+        prepared["timings"]["validate"] = validate
+        return prepared
+    
+    def prepare_payload(self,
+                        title: str,
+                        content: str = None,
+                        url: str = None,
+                        image_path: str = None) -> Dict[str, Any]:
+        """Run the image through the media cache and build the submit arguments.
+
+        Makes no API requests, so it is safe to run on a worker thread ahead
+        of the post's slot. Phase durations are returned under ``timings``.
+        """
+        prepared = {"timings": {}}
+        if image_path and os.path.exists(image_path):
+            # Image post; upload the cached, size-bounded version of the creative
+            started = self._timer()
+            upload_path = self.media_cache.prepare(image_path)
+            prepared["timings"]["media"] = self._timer() - started
+            prepared.update(method="submit_image", kwargs={"title": title, "image_path": upload_path})
+        elif url:
+            # Link post
+            prepared.update(method="submit", kwargs={"title": title, "url": url})
+        else:
+            # Text post
+            prepared.update(method="submit", kwargs={"title": title, "selftext": content or ""})
+        return prepared
+    
     def post_content(self, 
                     subreddit_name: str, 
                     title: str, 
                     content: str = None, 
                     url: str = None, 
-                    image_path: str = None) -> Dict[str, Any]:
-        """Post content to a specified subreddit."""
-        event = {
-            "timestamp": datetime.now().isoformat(),
-            "action": "post_attempt",
-            "subreddit": subreddit_name,
-            "title": title,
-        }
+                    image_path: str = None,
+                    prepared: Optional[Dict[str, Any]] = None,
+                    timings: Optional[Dict[str, float]] = None,
+                    attempts: Optional[List[Dict[str, Any]]] = None,
+                    allow_retry: bool = False) -> Dict[str, Any]:
+        """Post content to a specified subreddit.
+
+        ``prepared`` is the result of an earlier ``prepare_post`` call for the
+        same arguments; when given, only the submit call is left to do. A
+        ``prepare_payload`` result may be given instead, in which case the
+        subreddit is still resolved here.
+        ``timings`` holds phase durations measured by the caller (such as the
+        scheduler wait); they are recorded on the event with the others.
+
+        Failures are tagged with an ``error_class`` (transient, rate_limited
+        or permanent), and ``attempts`` carries the post's failed attempts so
+        far, this one included. With ``allow_retry``, a failure the retry
+        policy would try again gets status ``retry_scheduled`` and the delay
+        in ``retry_in``; the caller is expected to resubmit it then.
+        """
+        event = self._new_event("post_attempt", subreddit=subreddit_name, title=title)
+        # Phase durations in seconds, from the monotonic performance counter
+        event["timings"] = dict(timings or {})
+        if attempts:
+            event["attempts"] = list(attempts)
+        
+        try:
+            if prepared is None:
+                prepared = self.prepare_post(subreddit_name, title, content, url, image_path)
+            elif "subreddit" not in prepared:
+                started = self._timer()
+                prepared = dict(prepared, subreddit=self.resolve_subreddit(subreddit_name))
+                event["timings"]["validate"] = self._timer() - started
+            event["timings"].update(prepared.get("timings", {}))
+        except Exception as e:
+            event.update({
+                "status": "failed",
+                "error": f"Could not prepare post: {str(e)}"
+            })
+            self._classify_failure(event, *classify_error(e), allow_retry=allow_retry)
+            log = logger.warning if event["status"] == "retry_scheduled" else logger.error
+            log("Failed to prepare post for r/%s: %s", subreddit_name, e, extra={"event": event})
+            self._record_event(event)
+            return event
         
-        # Validate the subreddit exists
-        if not self.validate_subreddit(subreddit_name):
+        # Validation happened in prepare_post; the resolved object is reused for the submit
+        subreddit = prepared["subreddit"]
+        if subreddit is None:
             event.update({
                 "status": "failed",
                 "error": f"Subreddit {subreddit_name} could not be validated"
             })
-            self.events.append(event)
+            self._classify_failure(event, PERMANENT)
+            self._record_event(event)
             return event
         
+        started = self._timer()
         try:
-            subreddit = self.reddit.subreddit(subreddit_name)
-            
-            if image_path and os.path.exists(image_path):
-                # Image post
-                submission = subreddit.submit_image(title=title, image_path=image_path)
-            elif url:
-                # Link post
-                submission = subreddit.submit(title=title, url=url)
-            else:
-                # Text post
-                submission = subreddit.submit(title=title, selftext=content or "")
+            submit = getattr(subreddit, prepared["method"])
+            submission = submit(**prepared["kwargs"])
+            event["timings"]["submit"] = self._timer() - started
             
             # Update event with successful post details
             event.update({
                 "status": "success",
                 "post_id": submission.id,
                 "post_url": submission.url,
-                "timestamp_complete": datetime.now().isoformat()
+                "timestamp_complete": self._now()
             })
             
-            logger.info(f"Successfully posted to r/{subreddit_name}: {submission.url}")
+            logger.info("Successfully posted to r/%s: %s", subreddit_name, submission.url, extra={"event": event})
+            if self.performance is not None:
+                self.performance.track(submission.id, {"event_id": event["event_id"], "subreddit": subreddit_name})
+                self.performance.start()
+            if self.fingerprints is not None:
+                key = fingerprint({"subreddit": subreddit_name, "title": title, "content": content,
+                                   "url": url, "image_path": image_path})
+                self.fingerprints.add(key, subreddit_name, submission.id, submission.url)
             
         except Exception as e:
+            event["timings"]["submit"] = self._timer() - started
+            if _is_access_error(e):
+                # Access changed since validation; don't keep serving the stale object
+                self.subreddit_cache.invalidate(subreddit_name)
+            
             # Update event with error information
             event.update({
                 "status": "failed",
                 "error": str(e),
-                "timestamp_complete": datetime.now().isoformat()
+                "timestamp_complete": self._now()
             })
+            self._classify_failure(event, *classify_error(e), allow_retry=allow_retry)
             
-            logger.error(f"Failed to post to r/{subreddit_name}: {str(e)}")
+            log = logger.warning if event["status"] == "retry_scheduled" else logger.error
+            log("Failed to post to r/%s: %s", subreddit_name, e, extra={"event": event})
         
         # Store the event
-        self.events.append(event)
+        self._record_event(event)
         return event
     
-    def batch_post(self, posts_config: List[Dict[str, Any]], delay_range: tuple = (30, 120)) -> List[Dict[str, Any]]:
-        """Post multiple pieces of content to different subreddits with random delays between posts."""
+    def _classify_failure(self,
+                          event: Dict[str, Any],
+                          error_class: str,
+                          retry_after: Optional[float] = None,
+                          allow_retry: bool = False) -> None:
+        """Add a failed attempt to the event's history and decide whether it is retried."""
+        attempt = {"timestamp": event["timestamp"], "error": event["error"], "error_class": error_class}
+        event["attempts"] = event.get("attempts", []) + [attempt]
+        event["error_class"] = error_class
+        if retry_after is not None:
+            event["retry_after"] = retry_after
+        if not allow_retry:
+            return
+        delay = self.retry_policy.next_delay(error_class, len(event["attempts"]), retry_after)
+        if delay is not None:
+            event["status"] = "retry_scheduled"
+            event["retry_in"] = round(delay, 3)
+    
+    def _rate_limits(self) -> Optional[Dict[str, Any]]:
+        """Return PRAW's view of the current rate-limit budget, if it has one."""
+        try:
+            return self.reddit.auth.limits
+        except Exception:
+            return None
+    
+    def batch_post(self,
+                   posts_config: Iterable[Dict[str, Any]],
+                   delay_range: tuple = (30, 120),
+                   min_interval: float = 0,
+                   scheduler: Optional[PostScheduler] = None,
+                   prefetch: int = 4,
+                   on_start: Optional[Callable[[Dict[str, Any]], None]] = None,
+                   on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Post multiple pieces of content to different subreddits.
+
+        Posts are released by a ``PostScheduler``: consecutive posts to the
+        same subreddit are spaced by a random delay from ``delay_range``,
+        posts to other subreddits may go out in between, and the global
+        request budget reported by Reddit is never exceeded. While the
+        scheduler waits, the media and submit arguments of the next
+        ``prefetch`` posts are prepared on a small thread pool, and their
+        subreddits are validated on this thread, so only the submit call
+        remains when a slot opens. API requests all stay on this thread.
+
+        Items whose content was already posted to the same subreddit (per the
+        fingerprint index, or earlier in ``posts_config``) are skipped before
+        they are scheduled or validated, and recorded with status
+        ``skipped_duplicate``.
+
+        Rate-limited and transient failures are put back in the scheduler to
+        go out again after the wait Reddit asked for, or after an exponential
+        backoff, until the retry policy gives up; a rate limit holds every
+        subreddit, since Reddit applies it to the whole account. Returns the
+        final event of each post.
+
+        ``on_start(post_config)`` is called right before each attempt and
+        ``on_result(post_config, event)`` right after (or on skipping it), e.g.
+        to track jobs.
+        """
+        if scheduler is None:
+            scheduler = PostScheduler(delay_range=delay_range, min_interval=min_interval,
+                                      bucket=TokenBucket(clock=self._timer, wall_clock=self._clock),
+                                      clock=self._timer, sleep=self._sleep)
         results = []
         
-        for post_config in posts_config:
-            # Extract post details
-            subreddit = post_config.get("subreddit")
-            title = post_config.get("title")
-            content = post_config.get("content")
-            url = post_config.get("url")
-            image_path = post_config.get("image_path")
+        if self.fingerprints is not None:
+            def on_skip(post_config, event):
+                results.append(event)
+                if on_result:
+                    on_result(post_config, event)
             
-            # Post the content
-            result = self.post_content(subreddit, title, content, url, image_path)
-            results.append(result)
+            posts_config = self._skip_duplicates(posts_config, on_skip)
+        # id(post_config) -> (post_config, future of prepare_payload)
+        prepared = {}
+        # id(post_config) -> failed attempts of a post waiting to be retried
+        attempts = {}
+        
+        with ThreadPoolExecutor(max_workers=max(prefetch, 1), thread_name_prefix="prefetch") as pool:
+            def prefetch_upcoming(scheduler):
+                upcoming = [post for post in scheduler.peek(prefetch) if id(post) not in prepared]
+                for post in upcoming:
+                    future = pool.submit(self.prepare_payload,
+                                         post.get("title"),
+                                         post.get("content"),
+                                         post.get("url"),
+                                         post.get("image_path"))
+                    prepared[id(post)] = (post, future)
+                # Validation is a request, so it runs here while the pool handles media
+                for post in upcoming:
+                    try:
+                        self.resolve_subreddit(post.get("subreddit"))
+                    except Exception:
+                        # Already logged; the post resolves its subreddit again when it goes out
+                        pass
             
-            # If this isn't the last post, add a random delay
-            if post_config != posts_config[-1]:
-                delay = random.randint(delay_range[0], delay_range[1])
-                logger.info(f"Waiting {delay} seconds before next post...")
-                time.sleep(delay)
+            for post_config in scheduler.schedule(posts_config, before_wait=prefetch_upcoming if prefetch else None):
+                # Extract post details
+                subreddit = post_config.get("subreddit")
+                title = post_config.get("title")
+                content = post_config.get("content")
+                url = post_config.get("url")
+                image_path = post_config.get("image_path")
+                
+                # Use the prefetched preparation if it finished cleanly
+                payload = None
+                _, future = prepared.pop(id(post_config), (None, None))
+                if future is not None:
+                    try:
+                        payload = future.result()
+                    except Exception as e:
+                        logger.warning("Prefetch failed for r/%s, retrying inline: %s", subreddit, e)
+                
+                # Post the content
+                if on_start:
+                    on_start(post_config)
+                result = self.post_content(subreddit, title, content, url, image_path,
+                                           prepared=payload, timings={"wait": scheduler.last_wait},
+                                           attempts=attempts.pop(id(post_config), None), allow_retry=True)
+                if result["status"] == "retry_scheduled":
+                    attempts[id(post_config)] = result["attempts"]
+                    scheduler.defer(post_config, result["retry_in"])
+                    if result["error_class"] == RATE_LIMITED:
+                        scheduler.pause(result["retry_in"])
+                    logger.warning("Retrying post to r/%s in %.0f seconds (attempt %d of %d)",
+                                   subreddit, result["retry_in"], len(result["attempts"]) + 1,
+                                   self.retry_policy.max_attempts)
+                else:
+                    results.append(result)
+                if on_result:
+                    on_result(post_config, result)
+                
+                # Only an attempted submission (not a failed validation) starts the spacing interval
+                if "timestamp_complete" in result:
+                    scheduler.record_post(post_config)
+                scheduler.update_rate_limits(self._rate_limits())
                 
         return results
     
+    def _skip_duplicates(self,
+                         posts_config: Iterable[Dict[str, Any]],
+                         on_skip: Callable[[Dict[str, Any], Dict[str, Any]], None]) -> Iterable[Dict[str, Any]]:
+        """Pass through config items that are not duplicates; record the rest as skipped.
+
+        The first copy of a post within ``posts_config`` goes through even if
+        it later fails; the copies after it are skipped either way.
+        """
+        claimed = set()
+        for post_config in posts_config:
+            key = fingerprint(post_config)
+            original = self.fingerprints.lookup(key)
+            if original is None and key not in claimed:
+                claimed.add(key)
+                yield post_config
+                continue
+            
+            subreddit = post_config.get("subreddit")
+            event = self._new_event("post_attempt", subreddit=subreddit, title=post_config.get("title"))
+            event["status"] = "skipped_duplicate"
+            if original is not None:
+                original["posted_at"] = datetime.fromtimestamp(original["posted_at"]).isoformat()
+                event["duplicate_of"] = original
+            logger.info("Skipping duplicate post to r/%s: %s", subreddit,
+                        original["post_url"] if original else "repeated in this batch", extra={"event": event})
+            self._record_event(event)
+            on_skip(post_config, event)
+    
+    def _now(self) -> str:
+        return datetime.fromtimestamp(self._clock()).isoformat()
+    
+    def _new_event(self, action: str, **fields: Any) -> Dict[str, Any]:
+        """Start an event with its id, timestamp, action and tenant."""
+        event = {
+            "event_id": uuid.uuid4().hex,
+            "timestamp": self._now(),
+            "action": action,
+        }
+        event.update(fields)
+        if self.tenant:
+            event["tenant"] = self.tenant
+        return event
+    
+    def _record_event(self, event: Dict[str, Any]) -> None:
+        """Journal an event and keep it in the in-memory window."""
+        timings = event.get("timings")
+        if timings:
+            for phase, seconds in timings.items():
+                timings[phase] = round(seconds, 6)
+        if event.get("action") == "post_attempt":
+            POSTS_TOTAL.inc(status=event.get("status", "unknown"))
+        self.journal.append(event)
+        self.events.append(EventRecord.from_dict(event))
+        if self.event_bus is not None:
+            try:
+                self.event_bus.publish(event)
+            except Exception as e:
+                # Live delivery is best effort; the journal has the event
+                logger.warning("Failed to publish event: %s", e)
+    
+    def _record_metrics(self, context: Dict[str, Any], metrics: Dict[str, Any]) -> None:
+        """Record a collector reading as an event referring to the original post's event."""
+        event = self._new_event("post_metrics",
+                                subreddit=context.get("subreddit"),
+                                ref_event_id=context.get("event_id"),
+                                metrics=metrics)
+        self._record_event(event)
+    
     def get_events(self) -> List[Dict[str, Any]]:
-        """Get all recorded events."""
-        return self.events
+        """Get the most recent recorded events held in memory."""
+        return [record.to_dict() for record in self.events]
     
     def export_events(self, output_file: str = "events.json") -> None:
-        """Export all events to a JSON file."""
-        with open(output_file, 'w') as f:
-            json.dump(self.events, f, indent=2)
-        logger.info(f"Exported {len(self.events)} events to {output_file}")
+        """Export all journaled events to a JSON (or ``.jsonl``) snapshot file."""
+        if os.path.abspath(output_file) == os.path.abspath(self.journal.path):
+            self.journal.flush()
+            logger.info("Events are already journaled to %s", output_file)
+            return
+        count = self.journal.snapshot(output_file)
+        logger.info("Exported %d events to %s", count, output_file)
+    
+    def close(self) -> None:
+        """Stop background work, then flush and close the event journal."""
+        if self.performance is not None:
+            self.performance.stop()
+        self.journal.close()
+        if self.fingerprints is not None:
+            self.fingerprints.close()
+        if self.token_refresher is not None:
+            self.token_refresher.stop()
 
 
 # Example usage
@@ -196,4 +679,5 @@ if __name__ == "__main__":
     print("\nExample usage:")
     print("agent = RedditPostingAgent('your_credentials.json')")
     print("results = agent.batch_post(example_posts)")
-    print("agent.export_events('posting_history.json')")
\ No newline at end of file
+    print("agent.export_events('posting_history.json')")
+    print("agent.close()")
\ No newline at end of file
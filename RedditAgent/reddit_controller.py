@@ -13,6 +13,12 @@ import threading
 
 # Import the RedditPostingAgent class
 from reddit_agent import RedditPostingAgent
+from job_queue import JobQueue
+from config_loader import ConfigError, iter_post_config, validate_post_config
+from event_bus import EventBus, UnixSocketPublisher
+from fingerprint_index import DEFAULT_LOOKBACK
+from retry_policy import RetryPolicy
+from tenant_pool import load_manifest, run_tenants
 
 def create_sample_credentials():
     """Create a sample credentials file if it doesn't exist."""
@@ -34,16 +40,24 @@ def create_sample_credentials():
     return True
 
 def load_post_config(config_file):
-    """Load posting configuration from JSON file."""
-    try:
-        with open(config_file, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
+    """Validate a posting configuration file and return a lazy iterator over its items.
+
+    The whole file is checked up front, streaming, so a bad item fails the
+    run before anything is posted. Accepts JSON arrays and JSONL.
+    """
+    if not os.path.exists(config_file):
         print(f"Config file {config_file} not found.")
         return None
-    except json.JSONDecodeError:
-        print(f"Error parsing JSON in {config_file}.")
+    
+    count, errors = validate_post_config(config_file)
+    if errors:
+        print(f"Invalid posting configuration in {config_file}:")
+        for error in errors:
+            print(f"  {error}")
+        return None
+    if count == 0:
         return None
+    return iter_post_config(config_file)
 
 def create_sample_config():
     """Create a sample post configuration file."""
@@ -71,41 +85,158 @@ def create_sample_config():
         print("Created sample post_config.json file.")
         print("Please update with your desired posting configuration.")
 
-def run_dashboard():
-    """Run the dashboard in a separate process."""
+def run_dashboard(events_file="events.jsonl", in_process=False, bus=None, bus_socket=None):
+    """Run the dashboard, reading history from the given event journal.
+
+    With ``in_process`` it is served from a background thread of this
+    process and receives live events from ``bus``; otherwise it is started
+    as a separate process listening for them on ``bus_socket``. Without
+    either it falls back to watching the journal. The returned handle has a
+    ``terminate()`` method. Flask and watchdog must already be installed
+    (``pip install flask watchdog``).
+    """
+    if in_process:
+        import reddit_dashboard
+        dashboard = reddit_dashboard.start_in_background(events_file, bus=bus)
+    else:
+        env = dict(os.environ, REDDIT_AGENT_EVENTS=events_file)
+        if bus_socket:
+            env["REDDIT_AGENT_BUS"] = bus_socket
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reddit_dashboard.py")
+        dashboard = subprocess.Popen([sys.executable, script], env=env)
+    print("Dashboard started at http://127.0.0.1:5000")
+    return dashboard
+
+def wait_for_dashboard(dashboard_process):
+    """Keep a running dashboard up until Ctrl+C."""
+    if not dashboard_process:
+        return
+    print("Dashboard is still running at http://127.0.0.1:5000")
+    print("Press Ctrl+C to exit.")
     try:
-        # Check if Flask is installed
-        subprocess.check_call([sys.executable, "-c", "import flask"], 
-                             stdout=subprocess.DEVNULL, 
-                             stderr=subprocess.DEVNULL)
-    except subprocess.CalledProcessError:
-        print("Flask is not installed. Installing...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "flask", "watchdog"])
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        dashboard_process.terminate()
+
+def run_manifest(args, event_bus=None):
+    """Run every tenant in ``args.manifest``, each in its own worker process."""
+    try:
+        tenants = load_manifest(args.manifest)
+    except (OSError, ConfigError) as e:
+        print(f"Invalid tenant manifest: {str(e)}")
+        return
     
-    # Run the dashboard
-    dashboard_process = subprocess.Popen([sys.executable, "reddit_dashboard.py"])
-    print("Dashboard started at http://127.0.0.1:5000")
-    return dashboard_process
+    def report(summary):
+        if "error" in summary:
+            print(f"[{summary['tenant']}] failed: {summary['error']}")
+        else:
+            print(f"[{summary['tenant']}] done: {summary.get('done', 0)} posted, {summary.get('failed', 0)} failed, "
+                  f"{summary.get('skipped', 0)} skipped as duplicates")
+    
+    options = {
+        "workdir": args.tenant_dir,
+        "delay": args.delay,
+        "min_interval": args.min_interval,
+        "resume": args.resume,
+        "retry_failed": args.retry_failed,
+        "log_json": args.log_json,
+        "duplicate_lookback": args.duplicate_lookback * 86400,
+        "max_attempts": args.max_attempts,
+    }
+    print(f"Running {len(tenants)} tenants with up to {args.workers} workers...")
+    run_tenants(tenants, options, max_workers=args.workers, journal_file=args.journal,
+                event_bus=event_bus, on_summary=report)
+    print(f"All tenants finished. Events are in {args.journal}; per-tenant exports are under {args.tenant_dir}/")
+
+def run_simulation(args):
+    """Dry-run ``args.config`` on a virtual clock and report how long it would take."""
+    # The fake client needs praw's exception types; keep the controller importable without it
+    from simulation import DEFAULT_REDDIT_OPTIONS, format_report, simulate_campaign
+    
+    posts = load_post_config(args.config)
+    if not posts:
+        print("No valid post configuration found. Exiting.")
+        return
+    
+    reddit_options = dict(DEFAULT_REDDIT_OPTIONS,
+                          error_rate=args.simulate_error_rate,
+                          ratelimit_rate=args.simulate_ratelimit_rate)
+    print(f"Simulating {args.config} (nothing is posted)...")
+    report = simulate_campaign(posts,
+                               delay_range=(args.delay, args.delay + 30),
+                               min_interval=args.min_interval,
+                               max_attempts=args.max_attempts,
+                               reddit_options=reddit_options,
+                               seed=args.simulate_seed)
+    print(format_report(report))
+    with open(args.simulate_report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Full report with per-subreddit timelines written to {args.simulate_report}")
 
 def main():
     """Main function to run the Reddit posting agent."""
     parser = argparse.ArgumentParser(description="Reddit Posting Agent Controller")
-    parser.add_argument("--config", default="post_config.json", help="Path to posting configuration file")
+    parser.add_argument("--config", default="post_config.json", help="Path to posting configuration file (JSON array or JSONL)")
     parser.add_argument("--credentials", default="credentials.json", help="Path to Reddit API credentials file")
     parser.add_argument("--dashboard", action="store_true", help="Start the web dashboard")
-    parser.add_argument("--delay", type=int, default=60, help="Delay between posts in seconds")
+    parser.add_argument("--dashboard-in-process", action="store_true", help="Serve the dashboard from a thread of this process instead of a subprocess")
+    parser.add_argument("--delay", type=int, default=60, help="Minimum delay between posts to the same subreddit, in seconds")
+    parser.add_argument("--min-interval", type=float, default=0, help="Minimum delay between any two posts, in seconds")
     parser.add_argument("--export", default="events.json", help="Path to export events")
+    parser.add_argument("--journal", default="events.jsonl", help="Path to the append-only event journal")
+    parser.add_argument("--bus-socket", default="events.sock", help="Unix socket for live events to a dashboard subprocess")
+    parser.add_argument("--log-file", default="reddit_agent.log", help="Path to the agent log file (rotated by size)")
+    parser.add_argument("--log-json", action="store_true", help="Write structured JSON log records")
+    parser.add_argument("--manifest", help="JSON list of tenants ({name, credentials, config}) to run side by side instead of --config/--credentials")
+    parser.add_argument("--workers", type=int, default=4, help="With --manifest, maximum tenants posting at once (one process each)")
+    parser.add_argument("--tenant-dir", default="tenants", help="With --manifest, directory for each tenant's journal, job queue and log")
+    parser.add_argument("--jobs", default="jobs.db", help="Path to the campaign job queue database")
+    parser.add_argument("--resume", action="store_true", help="Resume the campaign in the job queue instead of starting over")
+    parser.add_argument("--retry-failed", action="store_true", help="With --resume, also retry jobs that failed")
+    parser.add_argument("--fingerprints", default="fingerprints.db", help="Path to the index of posted content used to skip duplicates")
+    parser.add_argument("--duplicate-lookback", type=float, default=DEFAULT_LOOKBACK / 86400,
+                        help="Skip posts whose content went to the same subreddit within this many days")
+    parser.add_argument("--max-attempts", type=int, default=5, help="Attempts per post before a rate-limited or transient failure is final")
+    parser.add_argument("--simulate", action="store_true", help="Dry-run the campaign on a virtual clock against a fake Reddit and report its projected duration")
+    parser.add_argument("--simulate-error-rate", type=float, default=0.0, help="With --simulate, fraction of submissions failing with a server error")
+    parser.add_argument("--simulate-ratelimit-rate", type=float, default=0.0, help="With --simulate, fraction of submissions hitting Reddit's RATELIMIT")
+    parser.add_argument("--simulate-seed", type=int, help="With --simulate, random seed for a reproducible run")
+    parser.add_argument("--simulate-report", default="simulation_report.json", help="With --simulate, where to write the full report")
     
     args = parser.parse_args()
     
     # Create sample files if they don't exist
-    create_sample_credentials()
-    create_sample_config()
+    if not args.manifest:
+        create_sample_credentials()
+        create_sample_config()
+    
+    # A simulation needs neither credentials nor a dashboard
+    if args.simulate:
+        if args.manifest:
+            print("--simulate runs a single --config campaign; it does not support --manifest.")
+            return
+        run_simulation(args)
+        return
     
     # Start dashboard if requested
     dashboard_process = None
+    event_bus = None
     if args.dashboard:
-        dashboard_process = run_dashboard()
+        # Live events go straight to the dashboard instead of through the journal file
+        if args.dashboard_in_process:
+            event_bus = EventBus()
+            dashboard_process = run_dashboard(args.journal, in_process=True, bus=event_bus)
+        else:
+            event_bus = UnixSocketPublisher(args.bus_socket)
+            dashboard_process = run_dashboard(args.journal, bus_socket=args.bus_socket)
+    
+    if args.manifest:
+        run_manifest(args, event_bus)
+        if isinstance(event_bus, UnixSocketPublisher):
+            event_bus.close()
+        wait_for_dashboard(dashboard_process)
+        return
     
     # Load post configuration
     posts = load_post_config(args.config)
@@ -138,7 +269,11 @@ def main():
     
     # Initialize the Reddit posting agent
     try:
-        agent = RedditPostingAgent(args.credentials)
+        agent = RedditPostingAgent(args.credentials, journal_file=args.journal, event_bus=event_bus,
+                                   log_file=args.log_file, log_json=args.log_json,
+                                   duplicate_index=args.fingerprints,
+                                   duplicate_lookback=args.duplicate_lookback * 86400,
+                                   retry_policy=RetryPolicy(max_attempts=args.max_attempts))
     except Exception as e:
         print(f"Failed to initialize Reddit posting agent: {str(e)}")
         if dashboard_process:
@@ -150,23 +285,43 @@ def main():
                 dashboard_process.terminate()
         return
     
-    # Post content
-    print(f"Starting to post {len(posts)} items...")
-    results = agent.batch_post(posts, delay_range=(args.delay, args.delay + 30))
-    
-    # Export events
-    agent.export_events(args.export)
-    print(f"Posting complete. Results exported to {args.export}")
+    # Queue the campaign; finished jobs are never posted again
+    jobs = JobQueue(args.jobs)
+    if args.resume:
+        interrupted = jobs.recover_interrupted()
+        if interrupted:
+            print(f"{interrupted} posts were interrupted mid-submit and marked failed; check Reddit before retrying them.")
+        if args.retry_failed:
+            jobs.retry_failed()
+    else:
+        jobs.clear()
+    jobs.enqueue(posts)
+    counts = jobs.counts()
     
-    # Keep dashboard running if started
-    if dashboard_process:
-        print("Dashboard is still running at http://127.0.0.1:5000")
-        print("Press Ctrl+C to exit.")
+    # Post content
+    print(f"Starting to post {counts.get('pending', 0)} items ({counts.get('done', 0)} already done)...")
+    try:
         try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            dashboard_process.terminate()
+            results = agent.batch_post(jobs.pending(),
+                                       delay_range=(args.delay, args.delay + 30),
+                                       min_interval=args.min_interval,
+                                       on_start=lambda post: jobs.mark_in_flight(post["job_key"]),
+                                       on_result=lambda post, event: jobs.mark_result(post["job_key"], event))
+        finally:
+            # Export events; everything up to a crash is already in the journal
+            agent.export_events(args.export)
+            jobs.close()
+        skipped = sum(1 for result in results if result.get("status") == "skipped_duplicate")
+        if skipped:
+            print(f"Skipped {skipped} posts already made within the last {args.duplicate_lookback:g} days.")
+        print(f"Posting complete. Results exported to {args.export}")
+        
+        # Keep dashboard running if started; post performance keeps being collected meanwhile
+        wait_for_dashboard(dashboard_process)
+    finally:
+        agent.close()
+        if isinstance(event_bus, UnixSocketPublisher):
+            event_bus.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,41 +3,321 @@ Reddit Agent Dashboard
 ---------------------
 A Flask-based web dashboard to display Reddit posting agent activities in real-time.
 """
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, jsonify, request
+import atexit
 import json
 import os
-from datetime import datetime
+import queue
+from datetime import datetime, timezone
 import threading
 import time
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import zlib
+from collections import Counter, deque
 
-app = Flask(__name__)
+from event_bus import EventBus, UnixSocketBusServer, consume
+from event_journal import JournalTailer
+from event_store import STATUS_KEYS, EventStore, success_rate
+from metrics import REGISTRY, MetricsRegistry
 
-# In-memory cache of events
-cached_events = []
+# The template ships next to this module, so startup never writes files
+app = Flask(__name__, template_folder=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates'))
+
+# Journal written by the posting agent
+EVENTS_FILE = os.environ.get('REDDIT_AGENT_EVENTS', 'events.jsonl')
+DEFAULT_PORT = 5000
+# Unix socket the agent publishes live events to, when running as a separate process
+BUS_SOCKET = os.environ.get('REDDIT_AGENT_BUS')
+# Seconds to coalesce bursts of filesystem events into one read
+REFRESH_DEBOUNCE = 0.25
+# SQLite file for ingested events; a temporary file by default. Rebuilt from the journal on start
+DASHBOARD_DB = os.environ.get('REDDIT_DASHBOARD_DB')
+# Page size limits for /api/events
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Per-client buffer for /api/stream; clients that fall this far behind are dropped
+STREAM_QUEUE_SIZE = 1000
+# Seconds between keepalive comments on idle streams
+STREAM_KEEPALIVE = 15
+# Rolling windows reported by /api/status, in seconds
+STATS_WINDOWS = {'5m': 300, '1h': 3600, '24h': 86400}
+
+class EventStats:
+    """Running aggregates over ingested events, updated once per event."""
+
+    def __init__(self, windows=STATS_WINDOWS):
+        self.total = 0
+        self.by_status = Counter()
+        self.by_subreddit = {}
+        self.by_tenant = {}
+        self.windows = windows
+        # Per window: events as (epoch, status) plus running status counts
+        self._window_events = {name: deque() for name in windows}
+        self._window_counts = {name: Counter() for name in windows}
+
+    def add(self, record):
+        status = record.status or 'unknown'
+        subreddit = (record.subreddit or '').lower()
+        self.total += 1
+        self.by_status[status] += 1
+        self.by_subreddit.setdefault(subreddit, Counter())[status] += 1
+        if record.tenant:
+            self.by_tenant.setdefault(record.tenant, Counter())[status] += 1
+
+        epoch = record.timestamp or time.time()
+        now = time.time()
+        for name, span in self.windows.items():
+            if epoch < now - span:
+                continue
+            self._window_events[name].append((epoch, status))
+            self._window_counts[name][status] += 1
+
+    def _expire(self, now):
+        for name, span in self.windows.items():
+            events = self._window_events[name]
+            counts = self._window_counts[name]
+            while events and events[0][0] < now - span:
+                _, status = events.popleft()
+                counts[status] -= 1
+
+    @staticmethod
+    def _summary(counts):
+        summary = {'total': sum(counts.values())}
+        summary.update((key, counts.get(status, 0)) for status, key in STATUS_KEYS.items())
+        summary['success_rate'] = success_rate(counts)
+        return summary
+
+    def summary(self):
+        """Global counts only; cheap enough to send with every update."""
+        return self._summary(self.by_status)
+
+    def to_dict(self, now=None):
+        self._expire(time.time() if now is None else now)
+        return {
+            'counts': self.summary(),
+            'by_status': dict(self.by_status),
+            'by_subreddit': {name: self._summary(counts) for name, counts in self.by_subreddit.items()},
+            'by_tenant': {name: self._summary(counts) for name, counts in self.by_tenant.items()},
+            'windows': {name: self._summary(self._window_counts[name]) for name in self.windows}
+        }
+
+# Dashboard-side metrics, built from the timings on ingested events
+metrics_registry = MetricsRegistry()
+phase_seconds = metrics_registry.histogram('reddit_agent_phase_seconds',
+                                           'Time spent in each phase of a post, from ingested events',
+                                           labels=('phase',))
+ingest_lag_seconds = metrics_registry.histogram('reddit_dashboard_ingest_lag_seconds',
+                                                'Delay between an event completing and the dashboard ingesting it')
+last_ingest_lag = metrics_registry.gauge('reddit_dashboard_last_ingest_lag_seconds',
+                                         'Ingest lag of the most recently ingested event')
+cached_events_gauge = metrics_registry.gauge('reddit_dashboard_cached_events',
+                                             'Events in the dashboard event store')
+
+def observe_event_metrics(record, now):
+    """Record an ingested event's phase timings and ingest lag."""
+    for phase, seconds in record.timings.items():
+        phase_seconds.observe(seconds, phase=phase)
+    completed = record.timestamp_complete or record.timestamp
+    if completed is None:
+        return
+    lag = max(now - completed, 0.0)
+    ingest_lag_seconds.observe(lag)
+    last_ingest_lag.set(lag)
+
+# Ingested events live in SQLite, not in memory; opened when ingestion starts
+event_store = None
+store_lock = threading.Lock()
+event_stats = EventStats()
+cache_lock = threading.Lock()
 last_update = datetime.now()
 
-class EventFileHandler(FileSystemEventHandler):
+tailer = JournalTailer(EVENTS_FILE)
+
+def set_events_file(events_file):
+    """Point the dashboard at a different journal; call before starting the watcher."""
+    global EVENTS_FILE, tailer
+    EVENTS_FILE = events_file
+    tailer.close()
+    tailer = JournalTailer(events_file)
+
+# Queues of connected /api/stream clients
+stream_subscribers = set()
+
+def _sse_message(kind, data, event_id=None):
+    prefix = f"id: {event_id}\n" if event_id is not None else ''
+    return f"{prefix}event: {kind}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _status_message():
+    return _sse_message('status', {
+        'counts': event_stats.summary(),
+        'events_count': event_store.count,
+        'last_update': last_update.isoformat()
+    })
+
+def _broadcast(messages):
+    """Push messages to every stream client; called with cache_lock held."""
+    for client in list(stream_subscribers):
+        try:
+            for message in messages:
+                client.put_nowait(message)
+        except queue.Full:
+            # Too slow to keep up; disconnect it and let it resync on reconnect
+            stream_subscribers.discard(client)
+            with client.mutex:
+                client.queue.clear()
+            client.put_nowait(None)
+
+def ingest_events(new_events):
+    """Add events to the store, update aggregates and notify stream clients.
+
+    Events already stored (seen on both the bus and the journal) are dropped.
+    """
+    global last_update
+    if not new_events:
+        return
+    now = time.time()
+    with cache_lock:
+        # Performance readings update the posts they refer to instead of adding rows
+        posts = [event for event in new_events if event.get('action') != 'post_metrics']
+        readings = [event for event in new_events if event.get('action') == 'post_metrics']
+        # Sequence numbers count stored events from 1 and act as cursors
+        added = event_store.add(posts) if posts else []
+        merged = event_store.merge_metrics(readings) if readings else []
+        if not added and not merged:
+            return
+        for _, record in added:
+            event_stats.add(record)
+            observe_event_metrics(record, now)
+        cached_events_gauge.set(event_store.count)
+        last_update = datetime.now()
+        if stream_subscribers:
+            messages = [_sse_message('post', record.to_dict(), seq) for seq, record in added]
+            messages.extend(_sse_message('metrics', update) for update in merged)
+            messages.append(_status_message())
+            _broadcast(messages)
+    if added:
+        print(f"Updated events store: {event_store.count} events (+{len(added)})")
+
+def open_event_store():
+    """Open the event store if it isn't yet and return it.
+
+    A database left at ``DASHBOARD_DB`` by an earlier run is replaced, since
+    history is re-read from the journal. The store is closed (and a
+    temporary one deleted) when the process exits.
+    """
+    global event_store
+    with store_lock:
+        if event_store is None:
+            if DASHBOARD_DB:
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(DASHBOARD_DB + suffix):
+                        os.remove(DASHBOARD_DB + suffix)
+            event_store = EventStore(DASHBOARD_DB)
+            atexit.register(event_store.close)
+        return event_store
+
+def reset_cache():
+    """Drop all stored events and aggregates."""
+    global event_stats, last_update
+    open_event_store()
+    with cache_lock:
+        event_store.clear()
+        event_stats = EventStats()
+        last_update = datetime.now()
+
+def refresh_events():
+    """Add newly journaled events to the store, one bounded read at a time."""
+    while True:
+        try:
+            new_events = tailer.read_new()
+        except Exception as e:
+            print(f"Error updating events store: {str(e)}")
+            return
+        if not new_events:
+            return
+        ingest_events(new_events)
+
+def load_history():
+    """Ingest the whole journal, rotated segments oldest first, then the active file.
+
+    The tailer starts following the active file first, so events appended
+    or rotated out while the older segments load are not missed.
+    """
+    tailer.open()
+    try:
+        for batch in tailer.read_rotated():
+            ingest_events(batch)
+    except Exception as e:
+        print(f"Error loading journal history: {str(e)}")
+    refresh_events()
+
+class EventFileHandler:
+    """Watchdog event handler for the journal.
+
+    Implements watchdog's ``dispatch`` protocol directly rather than
+    subclassing, so watchdog is only imported once watching starts.
+    """
+
+    def __init__(self):
+        self._timer = None
+        # Set when the journal changes while a refresh is pending or running
+        self._dirty = False
+        self._timer_lock = threading.Lock()
+
+    def _matches(self, path):
+        return os.path.basename(path) == os.path.basename(EVENTS_FILE)
+
+    def _schedule_refresh(self):
+        # Coalesce a burst of events into a single read after a short delay
+        with self._timer_lock:
+            if self._timer is not None:
+                self._dirty = True
+                return
+            self._timer = threading.Timer(REFRESH_DEBOUNCE, self._refresh)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _refresh(self):
+        while True:
+            with self._timer_lock:
+                self._dirty = False
+            refresh_events()
+            with self._timer_lock:
+                # A write that landed after the read drained the file needs another pass
+                if not self._dirty:
+                    self._timer = None
+                    return
+
+    def dispatch(self, event):
+        handler = getattr(self, f"on_{event.event_type}", None)
+        if handler:
+            handler(event)
+
     def on_modified(self, event):
-        global cached_events, last_update
-        if event.src_path.endswith('events.json'):
-            try:
-                with open('events.json', 'r') as f:
-                    cached_events = json.load(f)
-                    last_update = datetime.now()
-                    print(f"Updated events cache: {len(cached_events)} events")
-            except Exception as e:
-                print(f"Error updating events cache: {str(e)}")
+        if self._matches(event.src_path):
+            self._schedule_refresh()
+
+    def on_created(self, event):
+        if self._matches(event.src_path):
+            self._schedule_refresh()
+
+    def on_moved(self, event):
+        if self._matches(event.src_path) or self._matches(event.dest_path):
+            self._schedule_refresh()
 
 # Set up the file watcher
 def start_file_watcher():
+    from watchdog.observers import Observer
+    
     event_handler = EventFileHandler()
     observer = Observer()
-    observer.schedule(event_handler, path='.', recursive=False)
+    observer.schedule(event_handler, path=os.path.dirname(os.path.abspath(EVENTS_FILE)), recursive=False)
     observer.start()
     print("File watcher started")
     
+    # Pick up anything journaled before the watcher started
+    load_history()
+    
     try:
         while True:
             time.sleep(1)
@@ -50,203 +330,219 @@ def start_file_watcher():
 def index():
     return render_template('index.html')
 
+def _parse_time_arg(name):
+    """Parse an ISO timestamp query argument to epoch seconds, like record timestamps."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
 @app.route('/api/events')
 def get_events():
-    global cached_events
-    return jsonify(cached_events)
+    """Page through events newest first.
 
-@app.route('/api/status')
-def get_status():
-    return jsonify({
-        'events_count': len(cached_events),
-        'last_update': last_update.isoformat(),
-        'server_time': datetime.now().isoformat()
+    Query arguments: ``since`` (only events with a greater ``seq``),
+    ``before`` (only events with a smaller ``seq``, for older pages),
+    ``limit``, ``subreddit``, ``status``, ``tenant``, ``start`` and ``end``
+    (ISO times).
+    Responses carry an ETag and Last-Modified so unchanged polls get a 304.
+    """
+    with cache_lock:
+        latest_seq = event_store.last_seq
+        version = event_store.version
+        modified = last_update
+
+    # The store version also changes when metrics are merged into existing events
+    etag = f"{version}-{zlib.crc32(request.query_string):x}"
+    last_modified = modified.astimezone(timezone.utc).replace(microsecond=0)
+    if request.if_none_match:
+        if request.if_none_match.contains_weak(etag):
+            return '', 304
+    elif request.if_modified_since and request.if_modified_since >= last_modified:
+        return '', 304
+
+    try:
+        since = max(int(request.args.get('since', 0)), 0)
+        before = int(request.args['before']) if 'before' in request.args else None
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        start = _parse_time_arg('start')
+        end = _parse_time_arg('end')
+    except ValueError as e:
+        return jsonify({'error': f"Invalid query argument: {str(e)}"}), 400
+
+    page = event_store.query(since, before, limit,
+                             subreddit=request.args.get('subreddit'),
+                             status=request.args.get('status'),
+                             tenant=request.args.get('tenant'),
+                             start=start, end=end)
+
+    # More older events may exist if the page filled up
+    next_before = page[-1]['seq'] if len(page) >= limit else None
+    response = jsonify({
+        'events': page,
+        'latest_seq': latest_seq,
+        'next_before': next_before
     })
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
 
-# Create templates directory and HTML file
-os.makedirs('templates', exist_ok=True)
-
-with open('templates/index.html', 'w') as f:
-    f.write('''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Reddit Posting Agent Dashboard</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0-alpha1/dist/css/bootstrap.min.css" rel="stylesheet">
-    <style>
-        body { padding-top: 20px; }
-        .post-success { background-color: #d4edda; }
-        .post-failed { background-color: #f8d7da; }
-        #status-bar {
-            position: fixed;
-            bottom: 0;
-            width: 100%;
-            background-color: #f8f9fa;
-            padding: 5px 15px;
-            border-top: 1px solid #dee2e6;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Reddit Posting Agent Dashboard</h1>
-        <div class="row mb-3">
-            <div class="col">
-                <div class="card">
-                    <div class="card-header">
-                        <h5>Post Activity</h5>
-                    </div>
-                    <div class="card-body">
-                        <div class="row">
-                            <div class="col-md-4">
-                                <div class="card">
-                                    <div class="card-body text-center">
-                                        <h2 id="total-posts">0</h2>
-                                        <p>Total Posts</p>
-                                    </div>
-                                </div>
-                            </div>
-                            <div class="col-md-4">
-                                <div class="card">
-                                    <div class="card-body text-center">
-                                        <h2 id="successful-posts">0</h2>
-                                        <p>Successful</p>
-                                    </div>
-                                </div>
-                            </div>
-                            <div class="col-md-4">
-                                <div class="card">
-                                    <div class="card-body text-center">
-                                        <h2 id="failed-posts">0</h2>
-                                        <p>Failed</p>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="card mb-3">
-            <div class="card-header d-flex justify-content-between align-items-center">
-                <h5>Recent Activity</h5>
-                <button id="refresh-btn" class="btn btn-sm btn-primary">Refresh</button>
-            </div>
-            <div class="card-body">
-                <div class="table-responsive">
-                    <table class="table table-hover">
-                        <thead>
-                            <tr>
-                                <th>Time</th>
-                                <th>Subreddit</th>
-                                <th>Title</th>
-                                <th>Status</th>
-                                <th>Details</th>
-                            </tr>
-                        </thead>
-                        <tbody id="events-table">
-                            <tr>
-                                <td colspan="5" class="text-center">No events yet</td>
-                            </tr>
-                        </tbody>
-                    </table>
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <div id="status-bar">
-        <div class="d-flex justify-content-between">
-            <span>Last updated: <span id="last-update">Never</span></span>
-            <span>Events: <span id="events-count">0</span></span>
-        </div>
-    </div>
-
-    <script>
-        function formatDateTime(isoString) {
-            const date = new Date(isoString);
-            return date.toLocaleString();
-        }
-        
-        function updateDashboard() {
-            fetch('/api/events')
-                .then(response => response.json())
-                .then(events => {
-                    const eventsTable = document.getElementById('events-table');
-                    const totalPosts = document.getElementById('total-posts');
-                    const successfulPosts = document.getElementById('successful-posts');
-                    const failedPosts = document.getElementById('failed-posts');
-                    
-                    // Update counters
-                    totalPosts.textContent = events.length;
-                    successfulPosts.textContent = events.filter(e => e.status === 'success').length;
-                    failedPosts.textContent = events.filter(e => e.status === 'failed').length;
-                    
-                    // Clear table
-                    eventsTable.innerHTML = '';
-                    
-                    // Sort events by timestamp, newest first
-                    events.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-                    
-                    // Add events to table
-                    events.forEach(event => {
-                        const row = document.createElement('tr');
-                        row.className = event.status === 'success' ? 'post-success' : 'post-failed';
-                        
-                        row.innerHTML = `
-                            <td>${formatDateTime(event.timestamp)}</td>
-                            <td>r/${event.subreddit}</td>
-                            <td>${event.title}</td>
-                            <td>${event.status}</td>
-                            <td>${event.status === 'success' 
-                                ? `<a href="${event.post_url}" target="_blank">View Post</a>` 
-                                : `Error: ${event.error}`}</td>
-                        `;
-                        
-                        eventsTable.appendChild(row);
-                    });
-                    
-                    if (events.length === 0) {
-                        eventsTable.innerHTML = '<tr><td colspan="5" class="text-center">No events yet</td></tr>';
-                    }
-                })
-                .catch(error => {
-                    console.error('Error fetching events:', error);
-                });
-                
-            fetch('/api/status')
-                .then(response => response.json())
-                .then(status => {
-                    document.getElementById('last-update').textContent = formatDateTime(status.last_update);
-                    document.getElementById('events-count').textContent = status.events_count;
-                });
+@app.route('/api/stream')
+def stream_events():
+    """Server-Sent Events stream of new events and updated counters.
+
+    Resumes after ``Last-Event-ID`` (or the ``since`` query argument) by
+    replaying the missed events first, up to one client buffer's worth.
+    """
+    try:
+        since = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+    except ValueError:
+        return jsonify({'error': 'Invalid event id'}), 400
+
+    client = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    with cache_lock:
+        # Newest events first, so a client far behind gets the latest buffer's worth
+        backlog = event_store.query(since=max(since, 0), limit=STREAM_QUEUE_SIZE + 1)
+        reset = len(backlog) > STREAM_QUEUE_SIZE
+        backlog = reversed(backlog[:STREAM_QUEUE_SIZE])
+        initial = [_sse_message('post', event, event['seq']) for event in backlog]
+        initial.append(_status_message())
+        # Registered under the lock so no event falls between backlog and live updates
+        stream_subscribers.add(client)
+
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            if reset:
+                yield _sse_message('reset', {})
+            for message in initial:
+                yield message
+            while True:
+                try:
+                    message = client.get(timeout=STREAM_KEEPALIVE)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            with cache_lock:
+                stream_subscribers.discard(client)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus text-format metrics.
+
+    Includes the agent's own instruments when it runs in this process
+    (``--dashboard-in-process``); otherwise that registry is empty.
+    """
+    body = metrics_registry.render() + REGISTRY.render()
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+def _parse_bucket(value):
+    """Bucket width in seconds from e.g. ``300``, ``15m``, ``1h`` or ``1d``."""
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    if value[-1:] in units:
+        return int(value[:-1]) * units[value[-1]]
+    return int(value)
+
+@app.route('/api/stats')
+def get_stats():
+    """Campaign analytics from the event store.
+
+    Query arguments: ``bucket`` (histogram width, default ``1h``),
+    ``start`` and ``end`` (ISO times), ``subreddit`` and ``tenant``.
+    Returns post/failure counts per time bucket, per-subreddit success
+    rates and a breakdown of failures by error type.
+    """
+    try:
+        bucket = _parse_bucket(request.args.get('bucket', '1h'))
+        start = _parse_time_arg('start')
+        end = _parse_time_arg('end')
+    except ValueError as e:
+        return jsonify({'error': f"Invalid query argument: {str(e)}"}), 400
+    if bucket <= 0:
+        return jsonify({'error': 'Invalid query argument: bucket must be positive'}), 400
+
+    stats = event_store.stats(bucket, start=start, end=end,
+                              subreddit=request.args.get('subreddit'),
+                              tenant=request.args.get('tenant'))
+    stats['latest_seq'] = event_store.last_seq
+    return jsonify(stats)
+
+@app.route('/api/status')
+def get_status():
+    with cache_lock:
+        status = {
+            'events_count': event_store.count,
+            'latest_seq': event_store.last_seq,
+            'last_update': last_update.isoformat(),
+            'server_time': datetime.now().isoformat()
         }
-        
-        // Initial update
-        updateDashboard();
-        
-        // Refresh button
-        document.getElementById('refresh-btn').addEventListener('click', updateDashboard);
-        
-        // Auto-refresh every 10 seconds
-        setInterval(updateDashboard, 10000);
-    </script>
-</body>
-</html>
-    ''')
+        status.update(event_stats.to_dict())
+    return jsonify(status)
 
-if __name__ == '__main__':
+class DashboardThread(threading.Thread):
+    """Serves the dashboard from a daemon thread of the current process."""
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT):
+        super().__init__(name='dashboard', daemon=True)
+        from werkzeug.serving import make_server
+        self.server = make_server(host, port, app, threaded=True)
+
+    def run(self):
+        self.server.serve_forever()
+
+    def terminate(self):
+        self.server.shutdown()
+
+def attach_bus(bus):
+    """Ingest events published on ``bus`` as they arrive."""
+    return consume(bus.subscribe(), ingest_events)
+
+def _start_ingest(events_file, bus):
+    if events_file and events_file != EVENTS_FILE:
+        set_events_file(events_file)
+    open_event_store()
+    
+    # Create an empty events journal if it doesn't exist
+    if not os.path.exists(EVENTS_FILE):
+        open(EVENTS_FILE, 'a').close()
+    
+    if bus is not None:
+        # Live events come straight from the agent; the journal only supplies history.
+        # Subscribing first means nothing is missed; duplicates are dropped by event id.
+        attach_bus(bus)
+        load_history()
+        return
+    
     # Start file watcher in a separate thread
     watcher_thread = threading.Thread(target=start_file_watcher, daemon=True)
     watcher_thread.start()
+
+def start_in_background(events_file=None, host='127.0.0.1', port=DEFAULT_PORT, bus=None):
+    """Start ingestion and the web server on background threads; returns the server thread.
+
+    With ``bus`` (an ``EventBus`` the agent publishes to) events are pushed
+    in directly; otherwise the journal file is watched.
+    """
+    _start_ingest(events_file, bus)
+    server = DashboardThread(host, port)
+    server.start()
+    return server
+
+if __name__ == '__main__':
+    bus = None
+    if BUS_SOCKET:
+        bus = EventBus()
+        UnixSocketBusServer(BUS_SOCKET, bus).start()
+        print(f"Listening for live events on {BUS_SOCKET}")
+    _start_ingest(None, bus)
     
-    # Create an empty events file if it doesn't exist
-    if not os.path.exists('events.json'):
-        with open('events.json', 'w') as f:
-            json.dump([], f)
-    
-    # Start the Flask app
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # Start the Flask app; the debug reloader doubles startup, so it is opt-in
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', port=DEFAULT_PORT)
\ No newline at end of file
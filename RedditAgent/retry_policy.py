@@ -0,0 +1,88 @@
+"""
+Retry Policy
+------------
+Classification of posting errors and the backoff before retrying them.
+"""
+import random
+import re
+from typing import Optional, Tuple
+
+TRANSIENT = "transient"
+RATE_LIMITED = "rate_limited"
+PERMANENT = "permanent"
+
+# "Take a break for 7 minutes", "try again in 30 seconds", ...
+_RATELIMIT_WAIT = re.compile(r"(\d+(?:\.\d+)?)\s*(millisecond|second|minute|hour)s?", re.IGNORECASE)
+_UNIT_SECONDS = {"millisecond": 0.001, "second": 1, "minute": 60, "hour": 3600}
+
+
+def parse_ratelimit_wait(message: str) -> Optional[float]:
+    """Seconds Reddit asks us to wait in a RATELIMIT message, if it says."""
+    match = _RATELIMIT_WAIT.search(message or "")
+    if match is None:
+        return None
+    return float(match.group(1)) * _UNIT_SECONDS[match.group(2).lower()]
+
+
+def classify_error(error: Exception) -> Tuple[str, Optional[float]]:
+    """Return ``(error_class, retry_after)`` for an exception raised while posting.
+
+    Reddit's RATELIMIT API errors and HTTP 429s are ``RATE_LIMITED``, with
+    the wait the server asked for when it gave one. Server errors (5xx)
+    and network failures are ``TRANSIENT``. Everything else (bans, missing
+    subreddits, rejected submissions, bugs) is ``PERMANENT``.
+    """
+    # Loaded whenever one of their exceptions exists
+    from prawcore.exceptions import RequestException, ResponseException, ServerError, TooManyRequests
+    from praw.exceptions import RedditAPIException
+
+    if isinstance(error, RedditAPIException):
+        for item in error.items:
+            if item.error_type == "RATELIMIT":
+                return RATE_LIMITED, parse_ratelimit_wait(item.message)
+        return PERMANENT, None
+    if isinstance(error, TooManyRequests):
+        try:
+            return RATE_LIMITED, float(error.retry_after) if error.retry_after else None
+        except ValueError:
+            return RATE_LIMITED, None
+    if isinstance(error, ServerError):
+        return TRANSIENT, None
+    if isinstance(error, ResponseException):
+        status = getattr(error.response, "status_code", 0)
+        return (TRANSIENT, None) if status >= 500 else (PERMANENT, None)
+    if isinstance(error, (RequestException, ConnectionError, TimeoutError)):
+        return TRANSIENT, None
+    return PERMANENT, None
+
+
+class RetryPolicy:
+    """How long to wait before another attempt at a failed post, if at all.
+
+    Rate-limited posts wait what Reddit asked for plus a little jitter;
+    transient failures back off exponentially from ``base_delay`` (doubling
+    per attempt, capped at ``max_delay``, with up to 50% jitter either way).
+    Permanent failures, and posts that have used ``max_attempts``, are not
+    retried.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 5,
+                 base_delay: float = 30,
+                 max_delay: float = 3600,
+                 ratelimit_jitter: float = 5,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.ratelimit_jitter = ratelimit_jitter
+        self._random = rng or random.Random()
+
+    def next_delay(self, error_class: str, attempts: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait after ``attempts`` failed attempts, or ``None`` to give up."""
+        if error_class == PERMANENT or attempts >= self.max_attempts:
+            return None
+        if error_class == RATE_LIMITED and retry_after is not None:
+            return retry_after + self._random.uniform(0, self.ratelimit_jitter)
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return backoff * self._random.uniform(0.5, 1.5)
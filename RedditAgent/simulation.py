@@ -0,0 +1,139 @@
+"""
+Campaign Simulation
+-------------------
+Dry runs of a campaign on a virtual clock against a fake Reddit, for planning.
+"""
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fake_reddit import FakeReddit, OfflineAgent
+from post_scheduler import PostScheduler, TokenBucket
+from retry_policy import RetryPolicy
+
+# Fake client behaviour when none is given: roughly Reddit's per-request latency
+DEFAULT_REDDIT_OPTIONS = {"latency": 0.3, "jitter": 0.4}
+
+
+class VirtualClock:
+    """Time that only moves when something sleeps on it.
+
+    ``time`` serves as both the wall clock and the monotonic clock, so
+    timestamps and waits share one timeline starting at ``start``.
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        self._now = time.time() if start is None else start
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self._now += max(0.0, seconds)
+
+
+def simulate_campaign(posts_config: Iterable[Dict[str, Any]],
+                      delay_range: Tuple[float, float] = (30, 120),
+                      min_interval: float = 0,
+                      max_attempts: int = 5,
+                      reddit_options: Optional[Dict[str, Any]] = None,
+                      seed: Optional[int] = None) -> Dict[str, Any]:
+    """Run a campaign through the full posting pipeline without real time or API calls.
+
+    Validation, scheduling, retries, posting and event export all run as
+    they would for real, but against a ``FakeReddit`` built from
+    ``reddit_options`` and on a ``VirtualClock``, so hours of waiting take
+    milliseconds. Duplicates are only detected within the campaign itself.
+    Returns the report from ``build_report``.
+    """
+    clock = VirtualClock()
+    reddit = FakeReddit(seed=seed, clock=clock.time, sleep=clock.sleep,
+                        **(reddit_options if reddit_options is not None else DEFAULT_REDDIT_OPTIONS))
+    scheduler = PostScheduler(delay_range=delay_range, min_interval=min_interval,
+                              bucket=TokenBucket(clock=clock.time, wall_clock=clock.time),
+                              clock=clock.time, sleep=clock.sleep, rng=random.Random(seed))
+    started = clock.time()
+    begin = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="reddit-sim-") as workdir:
+        agent = OfflineAgent(reddit,
+                             journal_file=os.path.join(workdir, "events.jsonl"),
+                             log_file=None,
+                             log_level=logging.ERROR,
+                             collect_performance=False,
+                             duplicate_index=":memory:",
+                             retry_policy=RetryPolicy(max_attempts=max_attempts, rng=random.Random(seed)),
+                             clock=clock.time,
+                             timer=clock.time,
+                             sleep=clock.sleep)
+        try:
+            results = agent.batch_post(posts_config, scheduler=scheduler)
+            agent.export_events(os.path.join(workdir, "events.json"))
+        finally:
+            agent.close()
+    report = build_report(results, started, clock.time())
+    report["api_requests"] = dict(reddit.request_counts)
+    report["simulated_in_seconds"] = round(time.perf_counter() - begin, 3)
+    return report
+
+
+def build_report(results: List[Dict[str, Any]], started: float, finished: float) -> Dict[str, Any]:
+    """Projected duration, throughput and per-subreddit timeline of a campaign's final events."""
+    elapsed = finished - started
+    statuses = {}
+    subreddits = {}
+    for event in results:
+        status = event.get("status", "unknown")
+        statuses[status] = statuses.get(status, 0) + 1
+        entry = subreddits.setdefault((event.get("subreddit") or "").lower(),
+                                      {"posts": 0, "success": 0, "timeline": []})
+        entry["posts"] += 1
+        if status == "success":
+            entry["success"] += 1
+        at = datetime.fromisoformat(event["timestamp"]).timestamp() - started
+        entry["timeline"].append({"at": round(at, 1), "status": status,
+                                  "attempts": len(event.get("attempts", [])) + (status == "success")})
+    for entry in subreddits.values():
+        times = [point["at"] for point in entry["timeline"]]
+        entry["first"] = times[0]
+        entry["last"] = times[-1]
+    success = statuses.get("success", 0)
+    return {
+        "posts": len(results),
+        "statuses": statuses,
+        "started": datetime.fromtimestamp(started).isoformat(),
+        "finished": datetime.fromtimestamp(finished).isoformat(),
+        "projected_seconds": round(elapsed, 1),
+        "posts_per_hour": round(success / (elapsed / 3600), 2) if elapsed else None,
+        "subreddits": subreddits,
+    }
+
+
+def _duration(seconds: float) -> str:
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s"
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable summary of a simulation report."""
+    lines = [
+        f"Simulated {report['posts']} posts in {report.get('simulated_in_seconds', 0)} s",
+        f"Projected duration: {_duration(report['projected_seconds'])} "
+        f"({report['started']} to {report['finished']})",
+        f"Posts per hour: {report['posts_per_hour']}",
+        "Outcomes: " + ", ".join(f"{status} {count}" for status, count in sorted(report["statuses"].items())),
+    ]
+    if report.get("api_requests"):
+        lines.append("API requests: " + ", ".join(f"{kind} {count}" for kind, count in sorted(report["api_requests"].items())))
+    lines.append("Per subreddit (first post, last post, successful/total):")
+    for name, entry in sorted(report["subreddits"].items(), key=lambda item: item[1]["last"]):
+        lines.append(f"  r/{name}: {_duration(entry['first'])} -> {_duration(entry['last'])}, "
+                     f"{entry['success']}/{entry['posts']}")
+    return "\n".join(lines)
@@ -0,0 +1,199 @@
+"""
+Tenant Pool
+-----------
+Run several clients' campaigns side by side, one worker process per tenant.
+"""
+import json
+import multiprocessing
+import os
+import re
+import threading
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+from config_loader import ConfigError, iter_post_config, validate_post_config
+from event_journal import EventJournal
+from fingerprint_index import DEFAULT_LOOKBACK
+from retry_policy import RetryPolicy
+
+# Set in each worker process by _init_worker
+_sink_queue = None
+
+
+class QueueEventSink:
+    """Event bus stand-in that forwards a worker's events to the parent process."""
+
+    def __init__(self, event_queue):
+        self._queue = event_queue
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self._queue.put(event)
+
+
+def _tenant_name(entry: Dict[str, Any], index: int) -> str:
+    name = entry.get("name") or os.path.splitext(os.path.basename(entry["credentials"]))[0]
+    # Used as a directory name, so keep it to safe characters
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name) or f"tenant{index}"
+
+
+def load_manifest(manifest_file: str) -> List[Dict[str, Any]]:
+    """Read a tenant manifest.
+
+    The manifest is a JSON array (or ``{"tenants": [...]}``) of objects with
+    ``credentials`` and ``config`` paths, resolved relative to the manifest,
+    plus an optional ``name`` and per-tenant ``delay`` / ``min_interval``.
+    Raises ``ConfigError`` if it is malformed.
+    """
+    try:
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+    except ValueError as e:
+        raise ConfigError(f"{manifest_file}: {str(e)}")
+    if isinstance(manifest, dict):
+        manifest = manifest.get("tenants")
+    if not isinstance(manifest, list) or not manifest:
+        raise ConfigError(f"{manifest_file}: expected a non-empty list of tenants")
+
+    base = os.path.dirname(os.path.abspath(manifest_file))
+    tenants = []
+    names = set()
+    for index, entry in enumerate(manifest, start=1):
+        if not isinstance(entry, dict) or not entry.get("credentials") or not entry.get("config"):
+            raise ConfigError(f"tenant {index}: credentials and config are required")
+        tenant = dict(entry)
+        tenant["name"] = _tenant_name(entry, index)
+        if tenant["name"] in names:
+            raise ConfigError(f"tenant {index}: duplicate name {tenant['name']}")
+        names.add(tenant["name"])
+        for field in ("credentials", "config"):
+            tenant[field] = os.path.join(base, entry[field])
+        tenants.append(tenant)
+    return tenants
+
+
+def _init_worker(event_queue) -> None:
+    global _sink_queue
+    _sink_queue = event_queue
+
+
+def run_tenant(tenant: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Post one tenant's campaign; runs in a worker process.
+
+    Each tenant has its own agent (and so its own rate-limit budget and
+    scheduler), journal, job queue, duplicate index, token cache and log under
+    ``<workdir>/<name>/``.
+    Returns a summary of job states, or an ``error``.
+    """
+    # Imported here so the parent doesn't need praw to dispatch work
+    from job_queue import JobQueue
+    from reddit_agent import RedditPostingAgent
+
+    name = tenant["name"]
+    summary = {"tenant": name}
+    if not os.path.exists(tenant["config"]):
+        summary["error"] = f"Config file {tenant['config']} not found"
+        return summary
+    count, errors = validate_post_config(tenant["config"])
+    if errors or count == 0:
+        summary["error"] = "; ".join(errors) or "no posts in config"
+        return summary
+
+    tenant_dir = os.path.join(options["workdir"], name)
+    os.makedirs(tenant_dir, exist_ok=True)
+    try:
+        agent = RedditPostingAgent(tenant["credentials"],
+                                   journal_file=os.path.join(tenant_dir, "events.jsonl"),
+                                   event_bus=QueueEventSink(_sink_queue) if _sink_queue else None,
+                                   log_file=os.path.join(tenant_dir, "reddit_agent.log"),
+                                   log_json=options.get("log_json", False),
+                                   tenant=name,
+                                   # One token file per tenant; TokenStore only locks within a process
+                                   token_file=os.path.join(tenant_dir, ".reddit_tokens.json"),
+                                   duplicate_index=os.path.join(tenant_dir, "fingerprints.db"),
+                                   duplicate_lookback=options.get("duplicate_lookback", DEFAULT_LOOKBACK),
+                                   retry_policy=RetryPolicy(max_attempts=options.get("max_attempts", 5)))
+    except Exception as e:
+        summary["error"] = f"Failed to initialize agent: {str(e)}"
+        return summary
+
+    jobs = JobQueue(os.path.join(tenant_dir, "jobs.db"))
+    try:
+        if options.get("resume"):
+            jobs.recover_interrupted()
+            if options.get("retry_failed"):
+                jobs.retry_failed()
+        else:
+            jobs.clear()
+        jobs.enqueue(iter_post_config(tenant["config"]))
+        delay = tenant.get("delay", options["delay"])
+        agent.batch_post(jobs.pending(),
+                         delay_range=(delay, delay + 30),
+                         min_interval=tenant.get("min_interval", options["min_interval"]),
+                         on_start=lambda post: jobs.mark_in_flight(post["job_key"]),
+                         on_result=lambda post, event: jobs.mark_result(post["job_key"], event))
+        summary.update(jobs.counts())
+    except Exception as e:
+        summary["error"] = str(e)
+    finally:
+        agent.export_events(os.path.join(tenant_dir, "events.json"))
+        agent.close()
+        jobs.close()
+    return summary
+
+
+def _run_tenant_safely(tenant: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return run_tenant(tenant, options)
+    except Exception as e:
+        return {"tenant": tenant["name"], "error": f"Worker crashed: {str(e)}"}
+
+
+def run_tenants(tenants: List[Dict[str, Any]],
+                options: Dict[str, Any],
+                max_workers: int = 4,
+                journal_file: str = "events.jsonl",
+                event_bus: Optional[Any] = None,
+                on_summary=None) -> List[Dict[str, Any]]:
+    """Run every tenant's campaign in a pool of at most ``max_workers`` processes.
+
+    Events from all workers are drained by a thread of this process into one
+    shared ``journal_file`` and, if given, ``event_bus``, each tagged with
+    its ``tenant``. ``on_summary(summary)`` is called as each tenant finishes.
+    """
+    event_queue = multiprocessing.Queue()
+    journal = EventJournal(journal_file)
+
+    def drain():
+        while True:
+            event = event_queue.get()
+            if event is None:
+                break
+            journal.append(event)
+            if event_bus is not None:
+                try:
+                    event_bus.publish(event)
+                except Exception:
+                    pass
+
+    drainer = threading.Thread(target=drain, name="tenant-event-drain", daemon=True)
+    drainer.start()
+
+    summaries = []
+    # A fresh process per tenant, so per-process state (logging, metrics) never leaks between them
+    pool = multiprocessing.Pool(max(1, min(max_workers, len(tenants))),
+                                initializer=_init_worker, initargs=(event_queue,),
+                                maxtasksperchild=1)
+    try:
+        for summary in pool.imap_unordered(partial(_run_tenant_safely, options=options), tenants):
+            summaries.append(summary)
+            if on_summary:
+                on_summary(summary)
+        pool.close()
+        pool.join()
+    finally:
+        pool.terminate()
+        # Workers have exited (flushing their queues) once the pool is joined
+        event_queue.put(None)
+        drainer.join()
+        journal.close()
+    return summaries
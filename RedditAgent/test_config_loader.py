@@ -0,0 +1,41 @@
+"""
+Tests for the streaming JSON array reader in config_loader.
+"""
+import io
+import json
+import unittest
+
+from config_loader import ConfigError, _iter_json_array
+
+
+def parse(text: str, chunk_size: int):
+    return list(_iter_json_array(io.StringIO(text), chunk_size))
+
+
+class IterJsonArrayTest(unittest.TestCase):
+
+    def test_items_split_across_chunks(self):
+        items = [{"subreddit": "test", "title": f"post {i}", "content": "x" * i} for i in range(20)]
+        items += [12345678, -0.5e3, "a string", [1, [2, 3]], None, True]
+        text = json.dumps(items, indent=2)
+        for chunk_size in (1, 2, 3, 7, 64, len(text)):
+            self.assertEqual(parse(text, chunk_size), items, f"chunk_size={chunk_size}")
+
+    def test_empty_array_and_surrounding_whitespace(self):
+        for chunk_size in (1, 4, 1024):
+            self.assertEqual(parse("  [ ]  \n", chunk_size), [])
+            self.assertEqual(parse("\n[1, 2]\n\n", chunk_size), [1, 2])
+
+    def test_number_at_chunk_boundary(self):
+        # "12" must not be taken for a complete number before "34" is read
+        self.assertEqual(parse("[1234]", 3), [1234])
+
+    def test_malformed_arrays(self):
+        for text in ("[1,]", "[1, ]", "[1]garbage", "[1] ]", "[1][2]", "[,1]", "[1 2]", "[1,", "[1", "{}"):
+            for chunk_size in (1, 2, 1024):
+                with self.assertRaises(ConfigError, msg=f"{text!r} chunk_size={chunk_size}"):
+                    parse(text, chunk_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+"""
+Token Store
+-----------
+Persisted OAuth tokens and shared HTTP sessions for Reddit clients.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("RedditAgent.auth")
+
+# Tokens this close to expiring are refreshed rather than reused, in seconds
+DEFAULT_REFRESH_MARGIN = 300
+
+_sessions: Dict[str, Any] = {}
+_sessions_lock = threading.Lock()
+
+
+def credentials_key(credentials: Dict[str, str]) -> str:
+    """Identify an app/account pair; tokens and sessions are shared per key."""
+    return f"{credentials.get('client_id')}:{credentials.get('username') or ''}"
+
+
+def shared_session(key: str):
+    """One ``requests.Session`` per credentials key, so agents reuse kept-alive connections."""
+    import requests
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = requests.Session()
+        return session
+
+
+class TokenStore:
+    """JSON file of access tokens keyed by ``credentials_key``.
+
+    The file holds bearer tokens, so it is created readable by the owner
+    only and replaced atomically on every write.
+    """
+
+    def __init__(self, path: str = ".reddit_tokens.json"):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning("Ignoring unreadable token store %s", self.path)
+            return {}
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._read().get(key)
+
+    def save(self, key: str, token: Dict[str, Any]) -> None:
+        with self._lock:
+            tokens = self._read()
+            tokens[key] = token
+            directory = os.path.dirname(os.path.abspath(self.path))
+            # mkstemp creates the file with mode 0600, so the token is never world-readable
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tokens-")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(tokens, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+
+class TokenRefresher:
+    """Keeps a prawcore authorizer's token persisted and fresh.
+
+    ``install`` loads a still-valid token from the store into the authorizer
+    (skipping the password grant) and saves every token it obtains from then
+    on. ``start`` refreshes in the background ``margin`` seconds before
+    expiry, so requests never wait on an auth round trip.
+
+    prawcore keeps the expiry in a private attribute whose name and clock
+    changed between releases (``_expiration_timestamp_ns`` on the monotonic
+    clock, ``_expiration_timestamp`` in wall-clock seconds before that), so
+    both are read and written. If neither is found, tokens are neither
+    cached nor refreshed early, and prawcore's own refresh is left to work.
+    """
+
+    def __init__(self, authorizer, store: TokenStore, key: str,
+                 margin: float = DEFAULT_REFRESH_MARGIN,
+                 clock: Callable[[], float] = time.time):
+        self.authorizer = authorizer
+        self.store = store
+        self.key = key
+        self.margin = margin
+        self._clock = clock
+        self._refresh = authorizer.refresh
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _expires_at(self) -> Optional[float]:
+        if self.authorizer.access_token is None:
+            return None
+        expiration_ns = getattr(self.authorizer, "_expiration_timestamp_ns", None)
+        if expiration_ns is not None:
+            return self._clock() + (expiration_ns - time.monotonic_ns()) / 1e9
+        expiration = getattr(self.authorizer, "_expiration_timestamp", None)
+        if expiration is not None:
+            return self._clock() + (expiration - time.time())
+        return None
+
+    def install(self) -> bool:
+        """Load a cached token into the authorizer; returns whether one was used."""
+        # Route every refresh (including prawcore's own, on expiry) through the store
+        self.authorizer.refresh = self.refresh
+        token = self.store.load(self.key)
+        if not token:
+            return False
+        remaining = token.get("expires_at", 0) - self._clock()
+        if remaining <= self.margin:
+            return False
+        self.authorizer.access_token = token["access_token"]
+        self.authorizer.scopes = set(token.get("scopes") or [])
+        self.authorizer._expiration_timestamp_ns = time.monotonic_ns() + int(remaining * 1e9)
+        self.authorizer._expiration_timestamp = time.time() + remaining
+        if token.get("refresh_token") and hasattr(self.authorizer, "refresh_token"):
+            self.authorizer.refresh_token = token["refresh_token"]
+        logger.info("Reusing cached Reddit token (expires in %d s)", remaining)
+        return True
+
+    def _fresh(self) -> bool:
+        expires_at = self._expires_at()
+        return expires_at is not None and expires_at - self._clock() > self.margin
+
+    def refresh(self, force: bool = False) -> None:
+        """Obtain a new token and persist it.
+
+        Unless ``force`` is set, a token that another thread refreshed while
+        this one waited for the lock is kept rather than replaced.
+        """
+        with self._lock:
+            if not force and self.authorizer.is_valid() and self._fresh():
+                return
+            self._refresh()
+            expires_at = self._expires_at()
+            if expires_at is None:
+                return
+            token = {
+                "access_token": self.authorizer.access_token,
+                "scopes": sorted(self.authorizer.scopes or []),
+                "expires_at": expires_at,
+            }
+            if getattr(self.authorizer, "refresh_token", None):
+                token["refresh_token"] = self.authorizer.refresh_token
+            try:
+                self.store.save(self.key, token)
+            except OSError as e:
+                logger.warning("Could not persist Reddit token: %s", e)
+
+    def _run(self) -> None:
+        delay = 0.0
+        while not self._stop.wait(delay):
+            expires_at = self._expires_at()
+            if self._fresh():
+                delay = expires_at - self._clock() - self.margin
+                continue
+            try:
+                self.refresh()
+                delay = 1.0
+                if self._expires_at() is None:
+                    logger.warning("Cannot read token expiry from this prawcore; leaving refreshes to prawcore")
+                    return
+            except Exception as e:
+                logger.warning("Background token refresh failed: %s", e)
+                delay = 60.0
+
+    def start(self) -> "TokenRefresher":
+        self._thread = threading.Thread(target=self._run, name="token-refresh", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()